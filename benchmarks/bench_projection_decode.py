@@ -0,0 +1,100 @@
+"""Bytes on the wire and decode time of the latest_* views with and without
+the Video projection, decoded as dicts or as lazily decoded raw BSON.
+
+    python benchmarks/bench_projection_decode.py [channels]
+
+No server is needed: the views' reply documents are encoded locally, which is
+what pymongo receives and decodes for a find() on them.
+"""
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import bson
+from bson import ObjectId
+from bson.raw_bson import DEFAULT_RAW_BSON_OPTIONS
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from video_browser.models import VIDEO_FIELDS, video_from_doc
+
+VIDEOS_PER_CHANNEL = 20
+
+
+def make_video(i):
+    """A video document roughly as the scraper stores it, most of it unused by the apps."""
+    return {
+        "_id": ObjectId(),
+        "title": f"Video number {i} with a reasonably long title",
+        "video_id": f"{i:011d}",
+        "published_at": datetime(2024, 1, 1) + timedelta(minutes=i),
+        "url": f"https://www.youtube.com/watch?v={i:011d}",
+        "duration": f"{i % 60:02d}:{i % 7:02d}",
+        "seen": False,
+        "channel_title": f"Channel {i // VIDEOS_PER_CHANNEL}",
+        "description": "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 15,
+        "tags": [f"tag{k}" for k in range(15)],
+        "thumbnails": {
+            size: {"url": f"https://i.ytimg.com/vi/{i:011d}/{size}.jpg", "width": 480, "height": 360}
+            for size in ("default", "medium", "high", "standard", "maxres")
+        },
+        "statistics": {"viewCount": str(i * 17), "likeCount": str(i), "commentCount": str(i % 97)},
+    }
+
+
+def make_replies(channels):
+    """(full, projected) BSON of the view documents, as they would come off the wire."""
+    full, projected = [], []
+    for c in range(channels):
+        videos = [make_video(c * VIDEOS_PER_CHANNEL + k) for k in range(VIDEOS_PER_CHANNEL)]
+        full.append(bson.encode({"_id": f"Channel {c}", "latest_videos": videos}))
+        # what the server returns for video_projection("latest_videos.")
+        kept = [{name: video[name] for name in VIDEO_FIELDS} for video in videos]
+        projected.append(bson.encode({"_id": f"Channel {c}", "latest_videos": kept}))
+    return b"".join(full), b"".join(projected)
+
+
+def best_of(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def all_videos(data, codec_options=bson.DEFAULT_CODEC_OPTIONS):
+    """The DataTable app: every channel's videos become Video objects during the load."""
+    return [
+        [video_from_doc(video) for video in channel["latest_videos"]]
+        for channel in bson.decode_all(data, codec_options)
+    ]
+
+
+def channel_names(data, codec_options=bson.DEFAULT_CODEC_OPTIONS):
+    """main.py: the list needs only the names; videos are read when a channel is highlighted."""
+    return [channel["_id"] for channel in bson.decode_all(data, codec_options)]
+
+
+def main():
+    channels = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000
+    full, projected = make_replies(channels)
+    print(f"{channels} channels x {VIDEOS_PER_CHANNEL} videos")
+    print(f"  on the wire, full:      {len(full) / 2**20:8.1f} MiB")
+    print(f"  on the wire, projected: {len(projected) / 2**20:8.1f} MiB"
+          f" ({(1 - len(projected) / len(full)) * 100:.1f} % less)")
+
+    print("  every video as Video (list_main_external_data.py):")
+    print(f"    full, dict:           {best_of(lambda: all_videos(full)) * 1000:8.1f} ms")
+    print(f"    projected, dict:      {best_of(lambda: all_videos(projected)) * 1000:8.1f} ms")
+    print(f"    projected, raw:       {best_of(lambda: all_videos(projected, DEFAULT_RAW_BSON_OPTIONS)) * 1000:8.1f} ms")
+
+    print("  channel names only (main.py until a channel is highlighted):")
+    print(f"    full, dict:           {best_of(lambda: channel_names(full)) * 1000:8.1f} ms")
+    print(f"    projected, dict:      {best_of(lambda: channel_names(projected)) * 1000:8.1f} ms")
+    print(f"    projected, raw:       {best_of(lambda: channel_names(projected, DEFAULT_RAW_BSON_OPTIONS)) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
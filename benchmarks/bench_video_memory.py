@@ -0,0 +1,72 @@
+"""Memory of the slotted Video against the dict-backed dataclass it replaced.
+
+    python benchmarks/bench_video_memory.py [videos]
+"""
+import gc
+import sys
+import tracemalloc
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from bson import ObjectId
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from video_browser.models import Video
+
+
+@dataclass
+class DataclassVideo:
+    """The Video dataclass as it was before it became slotted."""
+    _id: ObjectId
+    title: str
+    video_id: str
+    published_at: datetime
+    url: str = field(default="N/A")
+    duration: str = field(default="N/A")
+    seen: bool = field(default=False)
+
+
+def make_docs(count):
+    start = datetime(2024, 1, 1)
+    return [
+        {
+            "_id": ObjectId(),
+            "title": f"Video number {i} with a reasonably long title",
+            "video_id": f"{i:011d}",
+            "published_at": start + timedelta(minutes=i),
+            # decoded from BSON, so equal durations are separate str objects
+            "duration": f"{i % 60:02d}:{i % 7:02d}",
+        }
+        for i in range(count)
+    ]
+
+
+def measure(cls, count):
+    """Bytes still held once the source documents are gone, as after a load."""
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    docs = make_docs(count)
+    videos = [cls(**doc) for doc in docs]
+    del docs
+    gc.collect()
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del videos
+    return after - before
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    baseline = measure(DataclassVideo, count)
+    slotted = measure(Video, count)
+    print(f"{count} videos")
+    print(f"  dataclass: {baseline / 2**20:8.1f} MiB ({baseline / count:6.1f} B/video)")
+    print(f"  slotted:   {slotted / 2**20:8.1f} MiB ({slotted / count:6.1f} B/video)")
+    print(f"  saved:     {(1 - slotted / baseline) * 100:8.1f} %")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,28 @@
+import asyncio
 import datetime
 import os  # For data parsing
+import sys
+from pathlib import Path
 
 from textual import work
 from textual.app import App, ComposeResult
 from textual.containers import Horizontal, Vertical
-from textual.widgets import Header, Footer, ListView, ListItem, Label, Markdown
+from textual.widgets import Header, Footer, Markdown, ProgressBar
 from textual.reactive import reactive
 
+from bson import ObjectId as BsonObjectId
 from dotenv import load_dotenv
 
-from pymongo import MongoClient
-from pymongo.server_api import ServerApi
+from video_browser.channel_list import ChannelEntry, ChannelList
+from video_browser.coalesce import HighlightCoalescer
+from video_browser.doc_cache import load_docs, save_docs, saved_at
+from video_browser.lazy import ChannelLRU
+from video_browser.live import LiveUpdates
+from video_browser.models import video_projection
+from video_browser.prefetch import NeighbourPrefetcher
+from video_browser.render_cache import RenderCache
+from video_browser.repository import CHANNEL_FIELD, get_repository
+from video_browser.staleness import ChannelStaleness
 
 
 # ObjectId class needs to be defined if it's used in the 'data' variable
@@ -29,43 +41,79 @@ class ObjectId:
 load_dotenv()
 
 # --- MongoDB Configuration ---
+# database/collection names and the pooled client live in video_browser.repository
 MONGO_URI = os.getenv("MONGO_URI")
-MONGO_DATABASE_NAME = "youtube_data" 
-MONGO_COLLECTION_NAME = "videos"     
-
-# --- MongoDB Setup ---
-mongo_client = None
-video_collection = None
-try:
-    print(f"Connecting to MongoDB at {MONGO_URI}...")
-    mongo_client = MongoClient(MONGO_URI, serverSelectionTimeoutMS=5000, server_api= ServerApi('1')) # Timeout for connection
-    # Ping to confirm connection
-    mongo_client.admin.command('ping') 
-    print("Successfully connected to MongoDB.")
-    
-    db = mongo_client[MONGO_DATABASE_NAME]
-    video_collection = db[MONGO_COLLECTION_NAME]
 
-except Exception as e:
-    print(f"Error: Could not connect to MongoDB or set up collection: {e}")
-    print("Please ensure MongoDB is running and accessible, and MONGO_URI is correct.")
-    exit(1) # Exit if DB connection fails, as storing data is a key goal.
+# channel documents pulled per cursor batch while the app is already running
+BATCH_SIZE = 50
+# memory cap for the channel details Markdown cache
+DETAILS_CACHE_BYTES = 8 * 2**20
+# seconds a burst of highlights is debounced for, and the most the details pane may lag behind
+HIGHLIGHT_DEBOUNCE = 0.05
+HIGHLIGHT_MAX_WAIT = 0.2
+# channels either side of the highlighted one whose details are rendered ahead of time
+PREFETCH_RADIUS = 3
+# how many videos per channel the latest_ten view keeps; live updates keep to it too
+LATEST_N = 10
+# with --lazy only channel names are fetched up front and each channel's latest
+# LATEST_N videos when it is highlighted; this caps the videos kept
+LAZY_CACHE_BYTES = 16 * 2**20
+# seconds between polls for inserted videos when the server has no change streams
+LIVE_POLL_INTERVAL = 10.0
+# the latest_ten documents as of the last run, shown at startup while MongoDB is checked
+CHANNEL_CACHE_PATH = Path("latest_ten.bson")
 
+# --- Data Loading Logic ---
+# Removed load_data_from_file function
 
-# print("\n--- Fetching data from MongoDB View ---")
-# for doc in db.latest_three.find():
+def render_channel_details(channel_data) -> str:
+    """The right pane Markdown for one channel document."""
+    videos = channel_data.get('latest_videos', [])
 
-# --- Fetch data from MongoDB View ---
-data = (doc for doc in db.latest_ten.find())
+    channel_id_str = str(channel_data.get('_id', 'Unknown Channel'))
+    parts = [f"# {channel_id_str}\n\n"]
 
-# --- Data Loading Logic ---
-# Removed load_data_from_file function
+    if videos:
+        for video in videos:
+            title = video.get('title', 'No Title')
+            published_at = video.get('published_at', 'N/A')
+            video_duration = video.get('duration', 'N/A')
+
+            # Convert published_at to a string if it's a datetime object
+            if isinstance(published_at, datetime.datetime):
+                published_at_short = published_at.strftime("%Y-%m-%d")
+            else:
+                published_at_short = str(published_at)
+
+            parts.append(f"- {published_at_short} [{title}](https://www.youtube.com/watch?v={video.get('video_id', 'N/A')})")
+            parts.append(f" **Duration:** {video_duration}\n")
+
+    else:
+        parts.append("No videos found for this channel.")
+
+    return "".join(parts)
+
+def merge_latest_videos(old_videos, new_videos) -> list | None:
+    """The newest LATEST_N of both lists, None when `new_videos` adds nothing.
+
+    The live watermark is a whole second, so videos the view already
+    returned can be delivered again; they are recognised by `_id`.
+    """
+    known = {video['_id'] for video in old_videos}
+    new_videos = [video for video in new_videos if video['_id'] not in known]
+    if not new_videos:
+        return None
+    latest = sorted([*new_videos, *old_videos], key=lambda video: video['published_at'], reverse=True)
+    return latest[:LATEST_N]
 
 # --- Textual App Components ---
-class ChannelListItem(ListItem):
-    """A ListItem that holds channel data."""
-    def __init__(self, channel_data) -> None:
-        super().__init__(Label(str(channel_data.get('_id', 'Unknown Channel'))))
+class ChannelListItem(ChannelEntry):
+    """A ChannelList row that holds channel data."""
+    def __init__(self, channel_data, staleness: ChannelStaleness | None = None) -> None:
+        label = str(channel_data.get('_id', 'Unknown Channel'))
+        if staleness is not None:
+            label += staleness.suffix(label)
+        super().__init__(channel_data, label)
         self.channel_data = channel_data
 
 class VideoViewerApp(App):
@@ -80,18 +128,39 @@ class VideoViewerApp(App):
 
     video_details_content = reactive("") # For right pane
 
-    def __init__(self): # Removed data_filepath parameter
+    def __init__(self, repository=None, lazy=False, cache_path=None): # Removed data_filepath parameter
         super().__init__()
-        self.all_data = list(data) # Use the global 'data' variable
+        self.repository = repository or get_repository(MONGO_URI)
+        self.lazy = lazy
+        # None disables the local cache; lazy mode never uses it
+        self.cache_path = None if lazy else cache_path
+        self.staleness = ChannelStaleness()
+        # lazy mode: channel name -> its latest video documents, for recently highlighted channels
+        self.channel_videos = ChannelLRU((), LAZY_CACHE_BYTES)
+        self.all_data = [] # Filled by the load_channels worker after the first frame
         self.video_details_pane: Markdown | None = None
+        # Rendered details keyed by (channel _id, data_version); a reload bumps the version
+        self.details_cache = RenderCache(DETAILS_CACHE_BYTES)
+        self.data_version = 0
+        # channel _id -> bumped whenever live updates change that channel
+        self.channel_revisions = {}
+        self._shown_details_key = None
+        self.live = None
+        # what the videos collection looked like before the last load, None if unknown
+        self.fingerprint = None
+        self.details_updates = HighlightCoalescer(
+            self, self._show_details, delay=HIGHLIGHT_DEBOUNCE, max_wait=HIGHLIGHT_MAX_WAIT,
+        )
+        self.prefetcher = NeighbourPrefetcher(self, self._warm_details, radius=PREFETCH_RADIUS)
 
 
     def compose(self) -> ComposeResult:
         """Create child widgets for the app."""
         yield Header()
+        yield ProgressBar(id="load_progress", show_eta=False)
         with Horizontal(id="main_container"):
             with Vertical(id="left_pane"):
-                yield ListView(id="channel_list_view")
+                yield ChannelList(id="channel_list_view")
             with Vertical(id="right_pane"):
                 self.video_details_pane = Markdown(id="video_details_pane")
                 yield self.video_details_pane
@@ -99,104 +168,276 @@ class VideoViewerApp(App):
 
     def on_mount(self) -> None:
         """Called when the app is mounted."""
-        list_view = self.query_one("#channel_list_view", ListView)
-        
-        if not self.all_data:
-            if self.video_details_pane:
-                self.video_details_pane.update("# Error\\nFailed to load data or no data available from `data.txt`.")
-            return
-
-        for channel_doc in self.all_data:
-            item = ChannelListItem(channel_doc)
-            list_view.append(item)
-        
-        list_view.focus()
-        
-        # Automatically select the first item and display its details
-        if list_view.children and len(list_view.children) > 0:
-            list_view.index = 0  # Visually select the first item
-            first_item = list_view.children[0]
-            if isinstance(first_item, ChannelListItem):
-                self.call_later(self._update_video_details_for_item, first_item)
+        self.query_one("#channel_list_view", ChannelList).focus()
+        if self.cache_path is not None and self.cache_path.exists():
+            self._show_cached_channels()
+            self.revalidate_channels()
+        else:
+            self.load_channels()
 
     def action_refresh_db(self) -> None:
-        """Refresh the database connection and data."""
-        global mongo_client, video_collection, data
+        """Reload the channel list from MongoDB in the background, if anything changed."""
+        self.refresh_if_changed()
+
+    @work(exclusive=True, group="refresh")
+    async def refresh_if_changed(self) -> None:
+        """Fetch nothing when the collection's fingerprint is unchanged, only new videos after inserts."""
         try:
-            print(f"Reconnecting to MongoDB at {MONGO_URI}...")
-            mongo_client = MongoClient(MONGO_URI, serverSelectionTimeoutMS=5000, server_api= ServerApi('1'))
-            mongo_client.admin.command('ping')
-            print("Successfully reconnected to MongoDB.")
-            
-            db = mongo_client[MONGO_DATABASE_NAME]
-            video_collection = db[MONGO_COLLECTION_NAME]
-            data = (doc for doc in db.latest_ten.find())
-            self.all_data = list(data)  # Update the all_data variable
-            print("Data refreshed from MongoDB.")
+            fingerprint = await self.repository.fetch_fingerprint()
         except Exception as e:
-            print(f"Error: Could not reconnect to MongoDB or set up collection: {e}")
-            print("Please ensure MongoDB is running and accessible, and MONGO_URI is correct.")
-            exit(1)
-
-        # Close teh MongoDB connection
-        if mongo_client:
-            mongo_client.close()
-            print("MongoDB connection closed.")
-        # Re-mount the app to refresh the data
-        # self.on_mount() # Re-mounting is not necessary; we can just refresh the data
-        # Re-render the app to show the updated data
-        self.refresh()  # Refresh the app to show the updated data
-
-        
+            self.notify(f"Could not reach MongoDB: {e}", severity="error")
+            return
+        if self.fingerprint is not None and fingerprint == self.fingerprint:
+            self.notify("Already up to date")
+        elif self.live is not None and self.fingerprint is not None and fingerprint.only_grew_since(self.fingerprint):
+            # only inserts: fetch those past the live watermark and update just their channels
+            try:
+                await self.live.poll_once()
+            except Exception as e:
+                self.notify(f"Could not load new videos from MongoDB: {e}", severity="error")
+                return
+            self.fingerprint = fingerprint
+        else:
+            self.load_channels()
+
+    @work(exclusive=True, group="load")
+    async def load_channels(self) -> None:
+        """Stream channel documents into the list view without blocking the UI."""
+        self._start_loading()
+        # the view covers everything inserted before this
+        loaded_up_to = BsonObjectId.from_datetime(datetime.datetime.now(datetime.timezone.utc))
+        try:
+            self.fingerprint = await self.repository.fetch_fingerprint()
+        except Exception:
+            self.fingerprint = None
+        try:
+            if self.lazy:
+                summaries = await self.repository.fetch_channel_summaries()
+                self.channel_videos = ChannelLRU((summary["_id"] for summary in summaries), LAZY_CACHE_BYTES)
+                self._add_channels(summaries)
+            else:
+                # raw BSON: a channel's videos are only decoded when its details are rendered
+                batches = self.repository.iter_view_batches(
+                    "latest_ten", batch_size=BATCH_SIZE, projection=video_projection("latest_videos."), raw=True,
+                )
+                async for batch in batches:
+                    self._add_channels(batch)
+        except Exception as e:
+            self.fingerprint = None
+            self.notify(
+                f"Could not load data from MongoDB: {e}. Please ensure MongoDB is running and MONGO_URI is correct.",
+                severity="error",
+            )
+        finally:
+            self._finish_loading()
+        if self.all_data:
+            self._start_live_updates(loaded_up_to)
+
+    def _show_cached_channels(self) -> None:
+        """Render the last run's channels straight away; they are marked stale until revalidated."""
+        self.all_data = load_docs(self.cache_path)
+        self.staleness.mark_cached((str(doc.get('_id')) for doc in self.all_data), saved_at(self.cache_path))
+        list_view = self.query_one("#channel_list_view", ChannelList)
+        list_view.set_entries(ChannelListItem(channel_doc, self.staleness) for channel_doc in self.all_data)
+        self.query_one("#load_progress", ProgressBar).display = False
+        self.sub_title = f"{len(self.all_data)} channels (cached)"
+
+    @work(exclusive=True, group="load")
+    async def revalidate_channels(self) -> None:
+        """Check the cached channels against MongoDB and refetch only those that changed.
+
+        One aggregation returns every channel's newest published_at; a channel
+        whose newest cached video differs is refetched, one the server no
+        longer has is dropped.
+        """
+        loaded_up_to = BsonObjectId.from_datetime(datetime.datetime.now(datetime.timezone.utc))
+        try:
+            self.fingerprint = await self.repository.fetch_fingerprint()
+            summaries = await self.repository.fetch_channel_summaries()
+            server_latest = {summary["_id"]: summary["latest"] for summary in summaries if summary["_id"] is not None}
+            cached_latest = {
+                str(doc.get('_id')): max((video['published_at'] for video in doc.get('latest_videos', [])), default=None)
+                for doc in self.all_data
+            }
+            changed = [channel for channel, latest in server_latest.items() if cached_latest.get(channel) != latest]
+            fetched = await asyncio.gather(
+                *(self.repository.fetch_channel_videos(channel, limit=LATEST_N) for channel in changed)
+            )
+        except Exception as e:
+            self.fingerprint = None
+            self.notify(f"Could not revalidate the cached channels, showing them as saved: {e}", severity="warning")
+            # the catch-up poll fills in whatever was inserted since the cache was written
+            cached_at = datetime.datetime.fromtimestamp(self.staleness.cached_at, datetime.timezone.utc)
+            self._start_live_updates(BsonObjectId.from_datetime(cached_at))
+            return
+
+        self.staleness.mark_all_fresh()
+        self.all_data = [doc for doc in self.all_data if str(doc.get('_id')) in server_latest]
+        list_view = self.query_one("#channel_list_view", ChannelList)
+        list_view.set_entries(ChannelListItem(channel_doc) for channel_doc in self.all_data)
+        self._patch_channels({
+            channel: {'_id': channel, 'latest_videos': videos} for channel, videos in zip(changed, fetched)
+        })
+        self.sub_title = f"{len(self.all_data)} channels"
+        self.log(f"Revalidated {len(server_latest)} channels: {len(changed)} changed")
+        self._start_live_updates(loaded_up_to)
+
+    def _start_loading(self) -> None:
+        self.all_data = []
+        self.staleness.mark_all_fresh()
+        self.data_version += 1
+        self.details_cache.clear()
+        self.query_one("#channel_list_view", ChannelList).clear()
+        progress = self.query_one("#load_progress", ProgressBar)
+        progress.update(total=None, progress=0)
+        progress.display = True
+        self.sub_title = "Loading channels..."
+
+    def _add_channels(self, batch: list) -> None:
+        self.all_data.extend(batch)
+        self.query_one("#load_progress", ProgressBar).advance(len(batch))
+        self.sub_title = f"Loading channels... {len(self.all_data)}"
+
+        # The first appended entry gets highlighted, which also shows its details
+        list_view = self.query_one("#channel_list_view", ChannelList)
+        list_view.append_entries(ChannelListItem(channel_doc) for channel_doc in batch)
+
+    def _finish_loading(self) -> None:
+        self.query_one("#load_progress", ProgressBar).display = False
+        self.sub_title = f"{len(self.all_data)} channels"
+        if not self.all_data and self.video_details_pane:
+            self.video_details_pane.update("# Error\nFailed to load data or no data available from MongoDB.")
+
     @work(exclusive=True)
     async def _update_video_details_for_item(self, item: ChannelListItem | None) -> None: # Allow item to be None
         """Updates the right pane with video details for the given channel item."""
         if not item: # Handle case where no item is highlighted (e.g., empty list)
             if self.video_details_pane:
                 await self.video_details_pane.update("No item selected.")
+                self._shown_details_key = None
             return
 
-        selected_channel_data = item.channel_data
-        videos = selected_channel_data.get('latest_videos', [])
-        
-        channel_id_str = str(selected_channel_data.get('_id', 'Unknown Channel'))
-        details_md = f"# {channel_id_str}\n\n"
-        
-        if videos:
-            for video in videos:
-                title = video.get('title', 'No Title')
-                published_at = video.get('published_at', 'N/A')
-                video_duration = video.get('duration', 'N/A')
-
-                # Convert published_at to a string if it's a datetime object
-
-                if isinstance(published_at, datetime.datetime):
-                    published_at_str = published_at.strftime("%Y-%m-%d %H:%M:%S")
-                    published_at_short = published_at.strftime("%Y-%m-%d")
-                else:
-                    published_at_str = str(published_at)
-                    published_at_short = str(published_at)
-
-                details_md += f"- {published_at_short} [{title}](https://www.youtube.com/watch?v={video.get('video_id', 'N/A')})"
-                details_md += f" **Duration:** {video_duration}\n"
+        key = self._details_key(item)
+        if key == self._shown_details_key:
+            return  # already on screen, skip the Markdown re-parse
+
+        if self.lazy and key not in self.details_cache:
+            try:
+                await self._load_channel_videos(item)
+            except Exception as e:
+                self.notify(f"Could not load {item.label} from MongoDB: {e}", severity="error")
+                return
+
+        details_md = self.details_cache.get(key, lambda: render_channel_details(self._channel_doc(item)))
+        self.log(f"details cache: {self.details_cache.stats()}")
 
-        else:
-            details_md += "No videos found for this channel."
-        
         if self.video_details_pane:
             await self.video_details_pane.update(details_md)
-
-    async def on_list_view_highlighted(self, event: ListView.Highlighted) -> None: # Changed from on_list_view_selected
-        """Called when an item in the ListView is highlighted.""" # Docstring updated
+            self._shown_details_key = key
+
+    async def _load_channel_videos(self, item: ChannelListItem) -> None:
+        channel = item.channel_data.get('_id')
+        if not self.channel_videos.is_loaded(channel):
+            self.channel_videos[channel] = await self.repository.fetch_channel_videos(channel, limit=LATEST_N)
+            self.log(f"lazy channels: {self.channel_videos.stats()}")
+
+    def _channel_doc(self, item: ChannelListItem) -> dict:
+        """The channel document to render; in lazy mode its videos come from channel_videos."""
+        if not self.lazy:
+            return item.channel_data
+        channel = item.channel_data.get('_id')
+        return {'_id': channel, 'latest_videos': self.channel_videos[channel]}
+
+    def _details_key(self, item: ChannelListItem) -> tuple:
+        channel_id = str(item.channel_data.get('_id'))
+        return (channel_id, self.data_version, self.channel_revisions.get(channel_id, 0))
+
+    def _start_live_updates(self, since_id) -> None:
+        """Push videos inserted into MongoDB into the list and details pane, once per app."""
+        if self.live is not None:
+            return
+        self.live = LiveUpdates(
+            self.repository, self._apply_live_videos, since_id=since_id,
+            projection={**video_projection(), CHANNEL_FIELD: 1}, poll_interval=LIVE_POLL_INTERVAL,
+        )
+        self.run_worker(self.live.run, group="live", exclusive=True, exit_on_error=False)
+
+    def _apply_live_videos(self, docs: list) -> None:
+        new_videos = {}
+        for doc in docs:
+            channel = doc.get(CHANNEL_FIELD)
+            if channel is not None:
+                new_videos.setdefault(channel, []).append(doc)
+
+        list_view = self.query_one("#channel_list_view", ChannelList)
+        positions = {str(entry.channel_data.get('_id')): i for i, entry in enumerate(list_view.entries)}
+        updates = {}
+        for channel, videos in new_videos.items():
+            if self.lazy:
+                # refetched the next time its details are rendered
+                self.channel_videos.add_channel(channel)
+                self.channel_videos.unload(channel)
+                updates[channel] = {'_id': channel}
+            else:
+                i = positions.get(channel)
+                old_videos = list(list_view.entries[i].channel_data.get('latest_videos', [])) if i is not None else []
+                latest = merge_latest_videos(old_videos, videos)
+                if latest is not None:
+                    updates[channel] = {'_id': channel, 'latest_videos': latest}
+        self._patch_channels(updates)
+        self.log(f"live updates: {self.live.stats()}")
+
+    def _patch_channels(self, updates: dict) -> None:
+        """Replace (or append) the given channels' documents without touching the other rows."""
+        list_view = self.query_one("#channel_list_view", ChannelList)
+        positions = {str(entry.channel_data.get('_id')): i for i, entry in enumerate(list_view.entries)}
+        added = []
+        for channel, channel_data in updates.items():
+            self.channel_revisions[channel] = self.channel_revisions.get(channel, 0) + 1
+            i = positions.get(channel)
+            if i is None:
+                added.append(channel_data)
+            else:
+                self.all_data[i] = channel_data
+                list_view.entries[i] = ChannelListItem(channel_data, self.staleness)
+                list_view.refresh_entry(i)
+        if added:
+            self.all_data.extend(added)
+            list_view.append_entries(ChannelListItem(channel_data, self.staleness) for channel_data in added)
+            self.sub_title = f"{len(self.all_data)} channels"
+
+        highlighted = list_view.highlighted_entry
+        if highlighted is not None and str(highlighted.channel_data.get('_id')) in updates:
+            self.details_updates.submit(highlighted)
+
+    def _show_details(self, item: ChannelListItem | None) -> None:
+        # Exclusive worker, so a still-running update for an older item is cancelled
+        self._update_video_details_for_item(item)
+        self.log(f"details updates: {self.details_updates.stats()}")
+        list_view = self.query_one("#channel_list_view", ChannelList)
+        self.prefetcher.schedule(list_view.entries, list_view.index)
+
+    def _warm_details(self, item: ChannelListItem) -> None:
+        key = self._details_key(item)
+        if self.lazy and not self.channel_videos.is_loaded(item.channel_data.get('_id')):
+            return  # not fetched yet; prefetching does not go to the database
+        if key not in self.details_cache:
+            self.details_cache.put(key, render_channel_details(self._channel_doc(item)))
+
+    def on_channel_list_highlighted(self, event: ChannelList.Highlighted) -> None: # Changed from on_list_view_selected
+        """Called when an item in the ChannelList is highlighted.""" # Docstring updated
         if isinstance(event.item, ChannelListItem):
-            # await self._update_video_details_for_item(event.item)
-            self._update_video_details_for_item(event.item)
+            self.details_updates.submit(event.item)
         elif event.item is None: # Handle case where highlighting is removed (e.g. list becomes empty or loses focus)
-             await self._update_video_details_for_item(None)
+            self.details_updates.submit(None)
 
 
 if __name__ == "__main__":
 
 
-    app = VideoViewerApp() # Instantiate without data_filepath
+    # --lazy: fetch channel names at startup, videos only when a channel is highlighted
+    app = VideoViewerApp(lazy="--lazy" in sys.argv[1:], cache_path=CHANNEL_CACHE_PATH) # Instantiate without data_filepath
     app.run()
+    app.repository.close()
+    if app.cache_path is not None and app.all_data:
+        save_docs(app.cache_path, app.all_data)
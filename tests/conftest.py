@@ -0,0 +1,6 @@
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+# the shared package and the DataTable app, which lives in tmp/ as a script
+sys.path[:0] = [str(ROOT), str(ROOT / "tmp")]
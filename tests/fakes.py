@@ -0,0 +1,107 @@
+"""An in-process stand-in for VideoRepository, holding plain video documents."""
+import asyncio
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+from video_browser.repository import CHANNEL_FIELD, CollectionFingerprint
+
+
+def video_doc(channel, title, published_at, **fields):
+    _id = fields.pop("_id", None) or ObjectId()
+    return {
+        "_id": _id,
+        "title": title,
+        "video_id": fields.pop("video_id", f"v{_id}"),
+        "published_at": published_at,
+        "url": "N/A",
+        "duration": fields.pop("duration", "1:00"),
+        "seen": fields.pop("seen", False),
+        CHANNEL_FIELD: channel,
+        **fields,
+    }
+
+
+def channel_docs(channels=3, per_channel=5, now=None):
+    """Video documents for `channels` channels, one a day going back from `now`."""
+    now = now or datetime.now()
+    return [
+        video_doc(f"chan{c}", f"title {c}-{k}", now - timedelta(days=k, minutes=c))
+        for c in range(channels)
+        for k in range(per_channel)
+    ]
+
+
+class FakeRepository:
+    """The VideoRepository calls the apps make, answered from `self.docs`.
+
+    `stream_error` makes `watch_inserts` fail the way a standalone mongod
+    does; `insert()` adds a document and queues it for the change stream.
+    """
+
+    def __init__(self, docs, stream_error=None):
+        self.docs = list(docs)
+        self.stream_error = stream_error
+        self.pending = []
+        self.seen_writes = []
+        self.streams_closed = 0
+
+    def channels(self):
+        by_channel = {}
+        for doc in sorted(self.docs, key=lambda doc: doc["published_at"], reverse=True):
+            by_channel.setdefault(doc[CHANNEL_FIELD], []).append(doc)
+        return by_channel
+
+    async def iter_view_batches(self, view, batch_size=50, projection=None, raw=False):
+        items = [{"_id": channel, "latest_videos": videos} for channel, videos in self.channels().items()]
+        for start in range(0, len(items), batch_size):
+            yield items[start:start + batch_size]
+
+    async def fetch_videos(self, filter=None, sort=None, limit=0, projection=None):
+        after = (filter or {}).get("_id", {}).get("$gt")
+        docs = sorted(
+            (doc for doc in self.docs if after is None or doc["_id"] > after), key=lambda doc: doc["_id"],
+        )
+        return docs[:limit] if limit else docs
+
+    async def fetch_channel_summaries(self, new_since=None):
+        summaries = []
+        for channel, docs in sorted(self.channels().items()):
+            summary = {"_id": channel, "latest": docs[0]["published_at"]}
+            if new_since is not None:
+                summary["new_videos"] = sum(doc["published_at"] >= new_since for doc in docs)
+            summaries.append(summary)
+        return summaries
+
+    async def fetch_channel_videos(self, channel, limit=0):
+        docs = self.channels().get(channel, [])
+        return docs[:limit] if limit else docs
+
+    async def fetch_fingerprint(self):
+        return CollectionFingerprint(len(self.docs), max((doc["_id"] for doc in self.docs), default=None))
+
+    async def watch_inserts(self, projection=None, max_await_ms=1000):
+        if self.stream_error is not None:
+            raise self.stream_error
+        return object()
+
+    async def next_inserts(self, stream):
+        await asyncio.sleep(0.01)
+        if self.stream_error is not None:
+            raise self.stream_error
+        docs, self.pending = self.pending, []
+        return docs
+
+    async def close_stream(self, stream):
+        self.streams_closed += 1
+
+    async def set_seen_many(self, seen_by_id):
+        self.seen_writes.append(dict(seen_by_id))
+
+    def insert(self, doc):
+        self.docs.append(doc)
+        self.pending.append(doc)
+        return doc
+
+    def close(self):
+        pass
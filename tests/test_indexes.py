@@ -0,0 +1,23 @@
+from video_browser.indexes import winning_stages
+
+
+def test_winning_stages_of_an_aggregation():
+    plan = {"stage": "IXSCAN", "indexName": "channel_published"}
+    result = {
+        "stages": [
+            {
+                "$cursor": {
+                    "queryPlanner": {
+                        "parsedQuery": {"published_at": {"$gte": 0}},
+                        "winningPlan": {"stage": "FETCH", "inputStage": plan},
+                        "rejectedPlans": [{"stage": "COLLSCAN"}],
+                    },
+                    "executionStats": {"executionStages": {"stage": "FETCH", "inputStage": plan}},
+                },
+                "nReturned": 10,
+            },
+            {"$group": {"_id": "$channel", "count": {"$sum": 1}}, "nReturned": 3, "executionTimeMillisEstimate": 0},
+            {"$sort": {"sortKey": {"_id": 1}}, "nReturned": 3},
+        ],
+    }
+    assert list(winning_stages(result)) == ["FETCH", "IXSCAN", "$group", "$sort"]
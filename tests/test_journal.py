@@ -0,0 +1,98 @@
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+from video_browser.journal import CachePersistence
+from video_browser.models import Video
+from video_browser.snapshot import load_snapshot, snapshot_items, write_snapshot
+
+
+def videos(channel, count):
+    now = datetime(2026, 1, 1)
+    return [Video(ObjectId(), f"{channel} {k}", f"{channel}-{k}", now - timedelta(days=k)) for k in range(count)]
+
+
+def video_ids(data):
+    return {channel: [video.video_id for video in data[channel]] for channel in data}
+
+
+def test_snapshot_items_are_unaffected_by_later_changes(tmp_path):
+    data = {"a": videos("a", 3), "b": videos("b", 2)}
+    expected = video_ids(data)
+    items = snapshot_items(data)
+    # what the UI thread may do while a compaction thread writes `items`
+    data["c"] = videos("c", 1)
+    data["a"].append(videos("a", 4)[-1])
+    del data["b"]
+
+    write_snapshot(tmp_path / "data.snap", items)
+    assert video_ids(load_snapshot(tmp_path / "data.snap")) == expected
+
+
+def test_snapshot_items_of_a_snapshot(tmp_path):
+    write_snapshot(tmp_path / "first.snap", {"a": videos("a", 3), "b": videos("b", 2)})
+    data = load_snapshot(tmp_path / "first.snap")
+    data["a"][0].seen = True
+    items = snapshot_items(data)
+    data["a"].clear()
+
+    write_snapshot(tmp_path / "second.snap", items)
+    written = load_snapshot(tmp_path / "second.snap")
+    assert video_ids(written) == {"a": ["a-0", "a-1", "a-2"], "b": ["b-0", "b-1"]}
+    assert written["a"][0].seen
+
+
+def test_compactions_do_not_overlap(tmp_path):
+    persistence = CachePersistence(tmp_path / "data.snap")
+    data = {"a": videos("a", 2)}
+    persistence.mark_channel("a")
+    persistence.flush(data)
+
+    started, release = threading.Event(), threading.Event()
+
+    class Blocking(list):
+        def __iter__(self):
+            started.set()
+            release.wait()
+            return super().__iter__()
+
+    worker = threading.Thread(target=persistence.compact, args=(Blocking(snapshot_items(data)),))
+    worker.start()
+    started.wait()
+    assert persistence.compacting
+
+    exiting = threading.Thread(target=persistence.compact, args=(data,))
+    exiting.start()
+    exiting.join(0.1)
+    # the exit-time compaction waits for the one still writing
+    assert exiting.is_alive()
+    release.set()
+    worker.join()
+    exiting.join()
+    assert not persistence.compacting
+    assert video_ids(persistence.load()) == {"a": ["a-0", "a-1"]}
+
+
+def test_take_only_encodes_and_a_failed_write_keeps_the_records(tmp_path):
+    persistence = CachePersistence(tmp_path / "data.snap", tmp_path / "later" / "data.journal")
+    data = {"a": videos("a", 2)}
+    persistence.mark_channel("a")
+    assert persistence.take(data) > 0
+    assert not persistence.dirty
+    assert not persistence.journal_path.exists()
+
+    # the journal's directory does not exist yet
+    with pytest.raises(OSError):
+        persistence.write_pending()
+
+    data["a"][0].seen = True
+    persistence.mark_seen("a", data["a"][0])
+    persistence.take(data)
+    persistence.journal_path.parent.mkdir()
+    assert persistence.write_pending() > 0
+    assert persistence.write_pending() == 0
+    loaded = persistence.load()
+    assert video_ids(loaded) == {"a": ["a-0", "a-1"]}
+    assert loaded["a"][0].seen
@@ -0,0 +1,39 @@
+import asyncio
+
+import list_main_external_data as app_module
+from list_main_external_data import NEW_VIDEOS, MyApp
+from video_browser.lazy import ChannelLRU
+from video_browser.repository import CHANNEL_FIELD
+
+from fakes import FakeRepository, channel_docs
+
+
+def test_a_channel_gone_from_the_summaries_loses_its_count():
+    app_module.DATA = {}
+    repository = FakeRepository(channel_docs())
+    app = MyApp(repository, None, lazy=True)
+
+    async def run():
+        async with app.run_test() as pilot:
+            await pilot.pause(0.3)
+            assert NEW_VIDEOS.count("chan2") > 0
+            repository.docs = [doc for doc in repository.docs if doc[CHANNEL_FIELD] != "chan2"]
+            app.load_channel_summaries()
+            await pilot.pause(0.3)
+            assert "chan2" not in app_module.DATA
+            assert NEW_VIDEOS.count("chan2") == 0
+
+    asyncio.run(run())
+
+
+def test_on_unload_hears_of_every_channel_let_go():
+    unloaded = []
+    data = ChannelLRU(["a", "b", "c"], max_bytes=2000, on_unload=unloaded.append)
+    data["a"] = [{"title": "x" * 800}]
+    data["b"] = [{"title": "x" * 800}]
+    # past max_bytes, "a" is evicted
+    data["c"] = [{"title": "x" * 800}]
+    data.unload("b")
+    data.unload("b")
+    del data["c"]
+    assert unloaded == ["a", "b", "c"]
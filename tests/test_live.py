@@ -0,0 +1,95 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from bson import ObjectId
+
+from list_main_external_data import merge_new_videos
+from main import LATEST_N, merge_latest_videos
+from video_browser.live import LiveUpdates
+
+from fakes import FakeRepository, video_doc
+
+
+def run_until(live, condition, timeout=2.0):
+    async def run():
+        task = asyncio.create_task(live.run())
+        try:
+            async with asyncio.timeout(timeout):
+                while not condition():
+                    await asyncio.sleep(0.01)
+        finally:
+            task.cancel()
+
+    asyncio.run(run())
+
+
+def test_falls_back_to_polling_when_the_stream_fails():
+    repository = FakeRepository([], stream_error=RuntimeError("standalone"))
+    delivered = []
+    live = LiveUpdates(repository, delivered.extend, poll_interval=0.01)
+    inserted = repository.insert(video_doc("chan0", "new", datetime.now()))
+
+    run_until(live, lambda: delivered)
+    assert live.mode == "poll"
+    assert str(live.error) == "standalone"
+    assert delivered == [inserted]
+    assert live.since_id == inserted["_id"]
+
+
+def test_each_insert_is_delivered_once():
+    now = datetime.now(timezone.utc)
+    # inserted earlier in the second the watermark was taken in
+    loaded = video_doc("chan0", "loaded", now, _id=ObjectId.from_datetime(now - timedelta(seconds=5)))
+    repository = FakeRepository([loaded])
+    delivered = []
+    live = LiveUpdates(repository, delivered.extend, since_id=loaded["_id"], poll_interval=0.01)
+    first = repository.insert(video_doc("chan0", "first", now))
+    second = repository.insert(video_doc("chan1", "second", now))
+
+    # the catch-up poll and the change stream both see the two inserts
+    run_until(live, lambda: repository.pending == [] and len(delivered) >= 2)
+    assert live.mode == "change stream"
+    assert delivered == [first, second]
+    assert live.since_id == second["_id"]
+    assert live.delivered == 2
+
+
+def test_stream_delivers_inserts_that_commit_below_the_watermark():
+    now = datetime.now(timezone.utc)
+    repository = FakeRepository([])
+    ahead = repository.insert(video_doc("chan0", "ahead", now, _id=ObjectId.from_datetime(now + timedelta(minutes=1))))
+    # made by a writer whose clock is behind, committed after `ahead` was delivered
+    late = video_doc("chan0", "late", now, _id=ObjectId.from_datetime(now))
+    delivered = []
+
+    def apply(docs):
+        delivered.extend(docs)
+        if late not in repository.docs:
+            repository.insert(late)
+
+    live = LiveUpdates(repository, apply, poll_interval=0.01)
+    run_until(live, lambda: len(delivered) >= 2)
+    assert delivered == [ahead, late]
+    assert live.since_id == ahead["_id"]
+
+
+def test_merge_new_videos_skips_videos_the_channel_has():
+    now = datetime.now()
+    doc = video_doc("chan0", "new", now)
+    data = {}
+    assert merge_new_videos(data, [doc]) == {"chan0"}
+    assert merge_new_videos(data, [doc]) == set()
+    # published before the channel's newest video, still merged
+    older = video_doc("chan0", "older", now - timedelta(days=1))
+    assert merge_new_videos(data, [older]) == {"chan0"}
+    assert [video.title for video in data["chan0"]] == ["new", "older"]
+
+
+def test_merge_latest_videos_drops_redelivered_videos():
+    now = datetime.now()
+    old_videos = [video_doc("chan0", f"old {k}", now - timedelta(days=k)) for k in range(LATEST_N)]
+    fresh = video_doc("chan0", "fresh", now + timedelta(minutes=1))
+
+    assert merge_latest_videos(old_videos, old_videos[:2]) is None
+    latest = merge_latest_videos(old_videos, [old_videos[0], fresh])
+    assert [video['title'] for video in latest] == ["fresh", *(f"old {k}" for k in range(LATEST_N - 1))]
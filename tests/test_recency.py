@@ -0,0 +1,25 @@
+from datetime import date, datetime, timedelta
+
+from bson import ObjectId
+
+from video_browser.lazy import ChannelLRU
+from video_browser.models import Video
+from video_browser.recency import NewVideoIndex
+
+
+def test_a_loaded_lazy_channel_keeps_its_server_count():
+    today = date(2026, 1, 10)
+    index = NewVideoIndex(window_days=2, today=today)
+    index.set_count("a", 30)
+    index.set_count("b", 4)
+    data = ChannelLRU(["a", "b"], max_bytes=1 << 20)
+    # only the latest 20 of a's 30 new videos are loaded
+    now = datetime(2026, 1, 10, 12)
+    data["a"] = [Video(ObjectId(), f"a {k}", f"a-{k}", now - timedelta(minutes=k)) for k in range(20)]
+
+    index.build(data)
+    assert index.count("a") == 30
+    assert index.count("b") == 4
+
+    index.add_video("a", Video(ObjectId(), "a new", "a-new", now))
+    assert index.count("a") == 31
@@ -0,0 +1,90 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+import list_main_external_data as app_module
+from list_main_external_data import RAW_WATERMARKS, STALENESS, MyApp, video_from_doc
+from video_browser.journal import CachePersistence
+from video_browser.repository import CHANNEL_FIELD
+
+from fakes import FakeRepository, channel_docs, video_doc
+
+
+def cached_data(docs):
+    data = {}
+    for doc in sorted(docs, key=lambda doc: doc["published_at"], reverse=True):
+        data.setdefault(doc[CHANNEL_FIELD], []).append(video_from_doc(doc))
+    return data
+
+
+class UnreachableRepository(FakeRepository):
+    async def fetch_channel_summaries(self, new_since=None):
+        raise ConnectionError("server down")
+
+
+def test_failed_revalidation_still_clears_staleness_and_goes_live(tmp_path):
+    docs = channel_docs()
+    app_module.DATA = cached_data(docs)
+    STALENESS.mark_cached(app_module.DATA, time.time() - 3600)
+    app = MyApp(UnreachableRepository(docs), CachePersistence(tmp_path / "data.snap"))
+
+    async def run():
+        async with app.run_test() as pilot:
+            await pilot.pause(0.3)
+            assert not STALENESS.is_stale("chan0")
+            assert app.live is not None
+            messages = [notification.message for notification in app._notifications]
+            assert any(message.startswith("Could not revalidate the cache") for message in messages)
+
+    asyncio.run(run())
+
+
+class HeldRepository(FakeRepository):
+    """Holds every channel refetch until `release` is set."""
+
+    def __init__(self, docs):
+        super().__init__(docs)
+        self.release = asyncio.Event()
+
+    async def fetch_channel_videos(self, channel, limit=0):
+        await self.release.wait()
+        return await super().fetch_channel_videos(channel, limit)
+
+
+def test_channels_turn_fresh_as_they_are_confirmed(tmp_path):
+    docs = channel_docs()
+    app_module.DATA = cached_data(docs)
+    STALENESS.mark_cached(app_module.DATA, time.time() - 3600)
+    repository = HeldRepository(docs)
+    repository.docs.append(video_doc("chan1", "newer", datetime.now() + timedelta(minutes=1)))
+    app = MyApp(repository, CachePersistence(tmp_path / "data.snap"))
+
+    async def run():
+        async with app.run_test() as pilot:
+            await pilot.pause(0.3)
+            assert not STALENESS.is_stale("chan0")
+            assert STALENESS.is_stale("chan1")
+            assert not STALENESS.is_stale("chan9")
+            repository.release.set()
+            await pilot.pause(0.3)
+            assert not STALENESS.is_stale("chan1")
+            assert app_module.DATA["chan1"][0].title == "newer"
+
+    asyncio.run(run())
+
+
+def test_a_removed_channel_leaves_no_watermark_behind(tmp_path):
+    docs = channel_docs()
+    app_module.DATA = cached_data(docs)
+    app_module.high_water_id(app_module.DATA)
+    assert "chan2" in RAW_WATERMARKS
+    repository = FakeRepository([doc for doc in docs if doc[CHANNEL_FIELD] != "chan2"])
+    app = MyApp(repository, CachePersistence(tmp_path / "data.snap"))
+
+    async def run():
+        async with app.run_test() as pilot:
+            await pilot.pause(0.3)
+            assert "chan2" not in app_module.DATA
+            assert "chan2" not in RAW_WATERMARKS
+
+    asyncio.run(run())
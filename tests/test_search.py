@@ -0,0 +1,49 @@
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+from video_browser.models import Video
+from video_browser.search import TitleIndex
+
+
+def channel(name, *titles):
+    now = datetime(2026, 1, 1)
+    return [Video(ObjectId(), title, f"{name}-{k}", now - timedelta(days=k)) for k, title in enumerate(titles)]
+
+
+def found(index, query):
+    return [(match.channel, match.video_id) for match in index.search(query)]
+
+
+def test_changes_during_a_build_are_applied_when_it_finishes():
+    data = {f"c{i}": channel(f"c{i}", f"old title {i}") for i in range(4)}
+    index = TitleIndex()
+    build = index.build_steps(data, step=1)
+    next(build)
+
+    data["c0"] = channel("c0", "renamed title")
+    index.set_channel("c0", data)
+    del data["c3"]
+    index.remove_channel("c3")
+    data["c9"] = channel("c9", "added late")
+    index.set_channel("c9", data)
+    for _ in build:
+        pass
+
+    assert index.ready
+    assert found(index, "renamed") == [("c0", "c0-0")]
+    assert sorted(found(index, "old")) == [("c1", "c1-0"), ("c2", "c2-0")]
+    assert found(index, "late") == [("c9", "c9-0")]
+
+
+def test_clear_during_a_build_stops_it():
+    data = {f"c{i}": channel(f"c{i}", f"title {i}") for i in range(4)}
+    index = TitleIndex()
+    build = index.build_steps(data, step=1)
+    next(build)
+    index.clear()
+    for _ in build:
+        pass
+
+    assert not index.ready
+    assert index.stats() == "0 titles, 0 words, 0 dead entries"
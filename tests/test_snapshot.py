@@ -0,0 +1,52 @@
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+from video_browser.journal import CachePersistence
+from video_browser.models import Video, to_micros
+from list_main_external_data import data_watermarks, high_water_id
+from video_browser.snapshot import HEADER, load_snapshot, raw_video_watermark, write_snapshot
+
+
+def test_watermark_of_undecoded_channels_is_stored(tmp_path):
+    now = datetime(2026, 1, 1)
+    newest_id = ObjectId.from_datetime(now + timedelta(days=1))
+    a = [
+        # neither list order nor _id order follows published_at
+        Video(ObjectId.from_datetime(now), "old", "a-0", now - timedelta(days=3)),
+        Video(newest_id, "older", "a-1", now - timedelta(days=5)),
+        Video(ObjectId.from_datetime(now - timedelta(days=1)), "newest", "a-2", now),
+    ]
+    write_snapshot(tmp_path / "data.snap", {"a": a, "empty": []})
+
+    data = load_snapshot(tmp_path / "data.snap")
+    assert data.snapshot.raw_watermark("a") == (newest_id.binary, to_micros(now))
+    assert data.snapshot.raw_watermark("empty") == (None, None)
+    assert not data.is_decoded("a")
+    assert data.snapshot.raw_watermark("a") == raw_video_watermark(data["a"])
+
+
+def test_snapshot_of_another_version_is_dropped(tmp_path):
+    persistence = CachePersistence(tmp_path / "data.snap")
+    write_snapshot(persistence.snapshot_path, {"a": []})
+    with open(persistence.snapshot_path, "r+b") as f:
+        magic, _, channels, videos = HEADER.unpack(f.read(HEADER.size))
+        f.seek(0)
+        f.write(HEADER.pack(magic, 1, channels, videos))
+    persistence.journal_path.write_bytes(b"")
+
+    assert persistence.load() == {}
+    assert not persistence.exists()
+
+
+def test_high_water_id_covers_channels_set_since_loading(tmp_path):
+    now = datetime(2026, 1, 1)
+    write_snapshot(tmp_path / "data.snap", {"a": [Video(ObjectId.from_datetime(now), "a", "a-0", now)]})
+    data = load_snapshot(tmp_path / "data.snap")
+    assert high_water_id(data) == ObjectId.from_datetime(now)
+
+    newer = ObjectId.from_datetime(now + timedelta(hours=1))
+    data["b"] = [Video(newer, "b", "b-0", now - timedelta(days=1))]
+    assert high_water_id(data) == newer
+    assert data_watermarks(data) == (newer, {"a": now, "b": now - timedelta(days=1)})
+    assert high_water_id({}) is None
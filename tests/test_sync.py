@@ -0,0 +1,57 @@
+import asyncio
+from datetime import datetime
+
+import list_main_external_data as app_module
+from list_main_external_data import CustomListView, MyApp
+from video_browser.journal import CachePersistence
+
+from fakes import FakeRepository, channel_docs, video_doc
+
+
+def test_sync_reports_through_a_notification(tmp_path):
+    app_module.DATA = {}
+    repository = FakeRepository(channel_docs())
+    app = MyApp(repository, CachePersistence(tmp_path / "data.snap"))
+
+    async def run():
+        async with app.run_test() as pilot:
+            await pilot.pause(0.3)
+            repository.docs.append(video_doc("chan1", "synced", datetime.now()))
+            app.query_one(CustomListView).focus()
+            await pilot.press("r")
+            await pilot.pause(0.3)
+            assert app_module.DATA["chan1"][0].title == "synced"
+            messages = [notification.message for notification in app._notifications]
+            assert "Delta sync: 1 new documents, 1 channels changed" in messages
+
+    asyncio.run(run())
+
+
+class SlowRepository(FakeRepository):
+    """Hands the view over one channel at a time, slowly enough to refresh in between."""
+
+    async def iter_view_batches(self, view, batch_size=50, projection=None, raw=False):
+        async for batch in super().iter_view_batches(view, 1, projection, raw):
+            await asyncio.sleep(0.1)
+            yield batch
+
+
+def test_refresh_does_not_cancel_a_full_load(tmp_path):
+    app_module.DATA = {}
+    repository = SlowRepository(channel_docs())
+    app = MyApp(repository, CachePersistence(tmp_path / "data.snap"))
+
+    async def run():
+        async with app.run_test() as pilot:
+            await pilot.pause(0.15)
+            assert app.streaming
+            repository.docs.append(video_doc("chan1", "mid-load", datetime.now()))
+            app.query_one(CustomListView).focus()
+            await pilot.press("r")
+            await pilot.pause(0.5)
+            assert not app.streaming
+            assert sorted(app_module.DATA) == ["chan0", "chan1", "chan2"]
+            messages = [notification.message for notification in app._notifications]
+            assert "Still loading from MongoDB" in messages
+
+    asyncio.run(run())
@@ -0,0 +1,104 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import list_main_external_data as app_module
+from bson import ObjectId
+from list_main_external_data import (
+    CLOCK, NEW_VIDEOS, ROW_CELLS, CustomDataTable, MyApp, cell_changed, merge_new_videos, row_cells,
+)
+from rich.text import Text
+from video_browser.journal import CachePersistence
+from video_browser.models import Video
+from video_browser.render_cache import sizeof_cells
+
+from fakes import FakeRepository, channel_docs, video_doc
+
+
+def run_app(tmp_path, docs, test):
+    app_module.DATA = {}
+    app = MyApp(FakeRepository(docs), CachePersistence(tmp_path / "data.snap"))
+
+    async def run():
+        async with app.run_test() as pilot:
+            await pilot.pause(0.3)
+            await test(app, pilot)
+
+    asyncio.run(run())
+
+
+def title_style(table, row):
+    return str(table.get_row_at(row)[1].style)
+
+
+def test_cell_changed_sees_style_only_changes():
+    assert cell_changed(Text("a", style="bold red"), Text("a", style="dim"))
+    assert cell_changed(Text("a", style="bold red"), "a")
+    assert not cell_changed(Text("a", style="dim"), Text("a", style="dim"))
+    assert not cell_changed("12:00", "12:00")
+
+
+def test_toggling_a_recent_row_dims_it(tmp_path):
+    async def test(app, pilot):
+        table = app.query_one(CustomDataTable)
+        # the newest video of chan0 was published today
+        assert title_style(table, 0) == "bold red"
+        table.focus()
+        await pilot.press("t")
+        await pilot.pause()
+        assert table.videos_by_id[table.cursor_video_id()].seen
+        assert title_style(table, 0) == "dim"
+        await pilot.press("t")
+        await pilot.pause()
+        assert title_style(table, 0) == "bold red"
+
+    run_app(tmp_path, channel_docs(), test)
+
+
+def test_new_day_restyles_todays_rows_as_recent(tmp_path):
+    async def test(app, pilot):
+        table = app.query_one(CustomDataTable)
+        assert title_style(table, 0) == "bold red"
+        try:
+            app.start_new_day(CLOCK.today, CLOCK.today + timedelta(days=1))
+            await pilot.pause()
+            assert title_style(table, 0) == "bold green"
+        finally:
+            NEW_VIDEOS.refresh_cutoff(CLOCK.today)
+
+    run_app(tmp_path, channel_docs(), test)
+
+
+def test_row_cells_follow_edits():
+    video = Video(ObjectId(), "before", "edited-video", datetime(2020, 1, 1), duration="1:00")
+    assert row_cells(video) is row_cells(video)
+    video.title = "after"
+    video.duration = "2:00"
+    _, title, duration = row_cells(video)
+    assert str(title) == "after"
+    assert duration == "2:00"
+
+
+def test_row_cells_cache_counts_the_text_it_holds():
+    cells = ("2026-01-01 00:00:00", Text("x" * 1000, style="bold red"), "1:00")
+    assert sizeof_cells(cells) > 1000
+    assert ROW_CELLS.sizeof is sizeof_cells
+
+
+def test_a_new_video_on_top_keeps_the_rows_and_the_cursor(tmp_path):
+    async def test(app, pilot):
+        table = app.query_one(CustomDataTable)
+        table.focus()
+        await pilot.press("j", "j")
+        cursor_video_id = table.cursor_video_id()
+        kept_rows = [row.key.value for row in table.ordered_rows]
+        cleared = []
+        table.clear = lambda *args, **kwargs: cleared.append(args)
+
+        doc = video_doc(table.key, "just in", datetime.now() + timedelta(minutes=1))
+        app.show_new_videos(merge_new_videos(app_module.DATA, [doc]))
+        await pilot.pause()
+        assert not cleared
+        assert [row.key.value for row in table.ordered_rows] == [doc["video_id"], *kept_rows]
+        assert table.cursor_video_id() == cursor_video_id
+
+    run_app(tmp_path, channel_docs(), test)
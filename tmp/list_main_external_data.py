@@ -1,67 +1,149 @@
+import asyncio
 import os
 import pickle
+import sys
 
 from textual.app import App
-from textual.widgets import ListView, ListItem, Footer, Label, DataTable, Link
+from textual.screen import Screen
+from textual.widgets import Footer, DataTable, Input, ProgressBar
 from textual.binding import Binding
 from textual.containers import Horizontal
-from textual import on
+from textual import on, work
 from rich.text import Text
-from dataclasses import dataclass, field, fields
-from datetime import datetime, date, timedelta
-from dotenv import load_dotenv
-from pymongo.mongo_client import MongoClient
-from pymongo.server_api import ServerApi
 from bson import ObjectId
+from datetime import datetime, timezone
+from dotenv import load_dotenv
 from pathlib import Path
 
+# make the shared video_browser package at the repo root importable when run as a script
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from video_browser.channel_list import ChannelEntry, ChannelList
+from video_browser.clock import DayClock
+from video_browser.coalesce import HighlightCoalescer
+from video_browser.feed import LatestFeed
+from video_browser.journal import CachePersistence
+from video_browser.lazy import ChannelLRU
+from video_browser.live import LiveUpdates
+from video_browser.models import Video, from_micros, video_from_doc, video_projection
+from video_browser.paging import KeysetPager
+from video_browser.prefetch import NeighbourPrefetcher
+from video_browser.recency import NewVideoIndex
+from video_browser.render_cache import RenderCache, sizeof_cells
+from video_browser.repository import CHANNEL_FIELD, get_repository
+from video_browser.search import TitleIndex, resolve
+from video_browser.sorting import DEFAULT_SORT, SORT_COLUMNS, SortOrders
+from video_browser.snapshot import SnapshotData, raw_video_watermark, snapshot_items
+from video_browser.staleness import ChannelStaleness
+from video_browser.write_behind import SeenWriteBehind
+
 
 DATA = None
+# a channel's "(n)" counts videos published within this many days
+NEW_VIDEO_WINDOW_DAYS = 2
+# the app's idea of today; the day cutoffs below move only when it does
+CLOCK = DayClock()
+NEW_VIDEOS = NewVideoIndex(NEW_VIDEO_WINDOW_DAYS, today=CLOCK.today)
+# channels shown from the local cache until the startup revalidation confirms them
+STALENESS = ChannelStaleness()
 COLUMN_HEADERS = ("Time", "Title", "Duration")
+COLUMN_KEYS = ("time", "title", "duration")
+# how many videos per channel the latest_20 view keeps
+LATEST_N = 20
+# channel documents pulled per cursor batch during the initial load
+BATCH_SIZE = 50
+# seconds a burst of highlights is debounced for, and the most the table may lag behind
+HIGHLIGHT_DEBOUNCE = 0.05
+HIGHLIGHT_MAX_WAIT = 0.2
+# channels either side of the highlighted one whose rows are built ahead of time
+PREFETCH_RADIUS = 3
+# memory cap for the cache of built table rows
+ROW_CELLS_CACHE_BYTES = 4 * 2**20
+# (video_id, what the cells show, recency bucket) -> ready-to-render (Time, Title, Duration) cells
+ROW_CELLS = RenderCache(ROW_CELLS_CACHE_BYTES, sizeof=sizeof_cells)
+# recency buckets a title is styled by, and their styles; seen titles are dim whatever the bucket
+TODAY, RECENT, OLDER = "today", "recent", "older"
+TITLE_STYLES = {TODAY: "bold red", RECENT: "bold green", OLDER: None}
+# seconds between write-behind flushes of seen toggles
+SEEN_FLUSH_INTERVAL = 5.0
+# seconds between appends of changed channels/flags to the cache journal
+JOURNAL_FLUSH_INTERVAL = 5.0
+# with --lazy only channel names and counts are fetched up front; this caps the videos kept
+LAZY_CACHE_BYTES = 32 * 2**20
+# with --paged a channel's whole back catalogue is browsable, PAGE_SIZE videos per fetch;
+# PAGE_WINDOW pages are held and the next one is fetched PAGE_PREFETCH_ROWS before an edge
+PAGE_SIZE = 50
+PAGE_WINDOW = 4
+PAGE_PREFETCH_ROWS = 10
+# rows the latest feed takes from its merge at a time
+FEED_PAGE_SIZE = 100
+# title words -> videos, built when search is first opened and kept up to date with DATA
+SEARCH = TitleIndex()
+# most matches shown for a search
+SEARCH_LIMIT = 200
+# channel -> cached row orders for the table's sort specs
+SORT_ORDERS = SortOrders()
+# channel -> (its video list, raw watermark of that list); merge_new_videos drops
+# the channels it merges into in place, replaced lists are noticed by identity,
+# and channels that leave DATA are dropped with forget_watermark()
+RAW_WATERMARKS = {}
+# seconds between polls for inserted videos when the server has no change streams
+LIVE_POLL_INTERVAL = 10.0
+SNAPSHOT_PATH = Path("data.snap")
+# the old whole-DATA pickle, only read once to migrate to the snapshot
+PICKLE_PATH = Path("data.pkl")
 
 
-# nice trick with self.data and super() init Label
-class MyListItem(ListItem):
+# nice trick with self.data and super() init label
+class MyListItem(ChannelEntry):
     def __init__(self, channel_name):
-        self.data = channel_name
         label = channel_name
-        number = count_new_videos(channel_name)
+        number = NEW_VIDEOS.count(channel_name)
         if number > 0:
             label = f"{channel_name} ({number})"
-        super().__init__(Label(label))
+        super().__init__(channel_name, label + STALENESS.suffix(channel_name))
 
-class CustomListView(ListView):
+class CustomListView(ChannelList):
 
     BINDINGS = [
         Binding("enter", "select_cursor", "Select", show=False),
         Binding("k", "cursor_up", "Cursor up", show=False),
         Binding("j", "cursor_down", "Cursor down", show=False),
-        Binding("r", "load_data_from_db", "Load data from DB", show=True),
+        Binding("r", "sync_data_from_db", "Sync from DB", show=True),
+        Binding("R", "load_data_from_db", "Full reload", show=True),
     ]
 
     def action_load_data_from_db(self):
-        global DATA
-        DATA = load_data_from_db()
-        self.update_data()
+        self.app.refresh_from_db(full=True)
+
+    def action_sync_data_from_db(self):
+        self.app.refresh_from_db()
 
     def on_mount(self):
         self.update_data()
 
     def update_data(self):
-        self.clear()
-        for channel_name in DATA.keys():
-            self.append(MyListItem(channel_name))
+        NEW_VIDEOS.build(DATA)
+        self.set_entries(MyListItem(channel_name) for channel_name in DATA.keys())
 
+    def append_channels(self, channel_names):
+        self.append_entries(MyListItem(channel_name) for channel_name in channel_names)
 
-    
-def count_new_videos(key) -> int:
-    counter = 0
-    for video in DATA[key]:
-        if is_within_last_two_days(video.published_at):
-            counter += 1
-    return counter
- 
+    def refresh_channels(self, channel_names):
+        """Relabel the given channels after their videos changed, appending any new ones."""
+        positions = {entry.data: i for i, entry in enumerate(self.entries)}
+        new_channels = []
+        for channel_name in channel_names:
+            i = positions.get(channel_name)
+            if i is None:
+                new_channels.append(channel_name)
+            else:
+                self.entries[i] = MyListItem(channel_name)
+                self.refresh_entry(i)
+        self.append_channels(new_channels)
 
+
+    
 class CustomDataTable(DataTable):
 
     BINDINGS = [
@@ -69,58 +151,200 @@ class CustomDataTable(DataTable):
     Binding("k", "cursor_up", "Cursor up", show=True),
     Binding("j", "cursor_down", "Cursor down", show=True),
     Binding("t", "style_row", "Toggle row", show=True),
+    Binding("1", "sort_by('time')", "Sort by time", show=False),
+    Binding("2", "sort_by('title')", "Sort by title", show=False),
+    Binding("3", "sort_by('duration')", "Sort by duration", show=False),
+    Binding("4", "sort_by('seen')", "Sort by seen", show=False),
+    Binding("0", "reset_sort", "Default sort", show=False),
     ]
 
+    sortable = True
+    # (column, reverse) pairs, most significant first
+    sort_spec = DEFAULT_SORT
+
     def on_mount(self) -> None:
         self.cursor_type = "row"
-        self.add_columns(*COLUMN_HEADERS)
+        for column_key, header in zip(COLUMN_KEYS, COLUMN_HEADERS):
+            self.add_column(header, key=column_key)
         # self.add_rows(ROWS)
         self.log(self.columns)
         self.cursor_foreground_priority = 'renderable'
+        if self.sortable:
+            self.show_sort_spec()
+        # video_id -> cells currently shown for that row
+        self.shown_cells = {}
+        self.videos = []
+        self.videos_by_id = {}
 
-    def update_table(self, key):
-        self.clear()
-        self.videos = DATA[key]
+    def update_table(self, key, videos=None):
+        """Reconcile the rows against DATA[key] (or `videos`), touching only rows and cells that changed."""
+        self.videos = DATA[key] if videos is None else videos
+        self.videos_by_id = {video.video_id: video for video in self.videos}
         self.key = key
+        cursor_video_id = self.cursor_video_id()
+        ordered = [self.videos[i] for i in SORT_ORDERS.order(key, self.videos, self.sort_spec)]
+        wanted = {video.video_id: row_cells(video) for video in ordered}
+
+        if not wanted.keys() & self.shown_cells.keys():
+            # a different channel, nothing to keep
+            self.clear()
+            self.shown_cells = {}
+
+        for video_id in self.shown_cells.keys() - wanted.keys():
+            self.remove_row(video_id)
+
+        for video_id, cells in wanted.items():
+            old_cells = self.shown_cells.get(video_id)
+            if old_cells is None:
+                self.add_row(*cells, key=video_id)
+            elif old_cells is not cells:
+                # cells come from ROW_CELLS, so an unchanged row is the very same tuple
+                self.update_changed_cells(video_id, old_cells, cells)
+        self.shown_cells = wanted
+
+        # new rows are appended at the bottom and a new sort moves them all
+        if [row.key.value for row in self.ordered_rows] != list(wanted):
+            self.reorder_rows(list(wanted))
+
+        # keep the cursor on the same video when rows above it came or went
+        if cursor_video_id in wanted:
+            row_index = self.get_row_index(cursor_video_id)
+            if row_index != self.cursor_row:
+                self.move_cursor(row=row_index, animate=False)
 
-        for video in DATA[key]:
-            # if date is today, change color
-            if video.published_at.date() == date.today():
-                title = Text(video.title, style="bold red")
-            elif video.published_at.date() >= date.today() - timedelta(days=2):
-                title = Text(video.title, style="bold green")
+    def reorder_rows(self, video_ids):
+        """Put the rows in the order of `video_ids` (the cached sort order) without re-adding them."""
+        # each row's Time cell is a string built for that row alone, so its
+        # identity tells the rows apart where their values may not
+        position = {id(self.get_cell(video_id, "time")): i for i, video_id in enumerate(video_ids)}
+        self.sort("time", key=lambda cell: position[id(cell)])
+
+    def action_sort_by(self, column):
+        """Sort by `column` first, keeping the previous keys as tie-breakers; again flips its direction."""
+        if self.sort_spec[0][0] == column:
+            first = (column, not self.sort_spec[0][1])
+        else:
+            first = (column, SORT_COLUMNS[column])
+        self.set_sort_spec((first, *(key for key in self.sort_spec if key[0] != column)))
+
+    def action_reset_sort(self):
+        self.set_sort_spec(DEFAULT_SORT)
+
+    @on(DataTable.HeaderSelected)
+    def sort_by_header(self, event: DataTable.HeaderSelected):
+        if event.column_key.value in SORT_COLUMNS:
+            self.action_sort_by(event.column_key.value)
+
+    def set_sort_spec(self, spec):
+        if not self.sortable:
+            return
+        if self.app.paged:
+            # pages are fetched by time, so the table stays in time order
+            self.notify("Paged mode only sorts by time")
+            return
+        self.sort_spec = spec
+        self.show_sort_spec()
+        if self.row_count:
+            self.update_table(self.key, self.videos)
+
+    def show_sort_spec(self):
+        """Mark the sorted columns' headers with their direction and, with several keys, their rank.
+
+        seen has no column of its own and is marked on Title's header.
+        """
+        markers = {column_key: [] for column_key in COLUMN_KEYS}
+        for rank, (column, reverse) in enumerate(self.sort_spec, 1):
+            marker = f"{'▼' if reverse else '▲'}{rank if len(self.sort_spec) > 1 else ''}"
+            if column == "seen":
+                markers["title"].append(f"seen{marker}")
             else:
-                title = video.title
+                markers[column].insert(0, marker)
+        for column_key, header in zip(COLUMN_KEYS, COLUMN_HEADERS):
+            label = Text(header)
+            if markers[column_key]:
+                label.append(" " + " ".join(markers[column_key]), style="bold")
+            column = self.columns[column_key]
+            column.label = label
+            column.content_width = max(column.content_width, label.cell_len)
+        self.refresh()
 
-            if video.seen:
-                title = Text(video.title, style="dim")
-            
-            row = (video.published_at, title, video.duration)
-            self.add_row(*row, key=video.video_id)
+    def cursor_video_id(self):
+        if not self.row_count:
+            return None
+        row_key, _ = self.coordinate_to_cell_key(self.cursor_coordinate)
+        return row_key.value
 
+    def check_page_edges(self, first_row, last_row):
+        """Paged mode: fetch the next page once rows first_row..last_row near either end."""
+        pager = self.app.pager
+        if pager is None or pager.channel != self.key or pager.loading or not self.row_count:
+            return
+        if last_row >= self.row_count - 1 - PAGE_PREFETCH_ROWS and not pager.at_end:
+            self.app.load_page(pager, older=True)
+        elif first_row < PAGE_PREFETCH_ROWS and not pager.at_start:
+            self.app.load_page(pager, older=False)
 
-    def action_style_row(self):
-        row, col = self.cursor_row, self.cursor_column
-        # self.log(self.get_cell_at((row, col)))
-        # value = self.get_cell_at((row, col))
-        # self.update_cell_at((row, col), Text(str(value), style="bold red"))
-        id = self.videos[row]._id
+    @property
+    def loads_on_scroll(self):
+        return self.app.paged
 
-        self.videos[row].seen = not self.videos[row].seen
+    def watch_scroll_y(self, old_value, new_value):
+        super().watch_scroll_y(old_value, new_value)
+        if self.loads_on_scroll:
+            # only the edge being scrolled towards, so following the cursor back
+            # after a page swap does not fetch the page that was just dropped
+            top = round(new_value)
+            bottom = top + self.scrollable_content_region.height
+            if new_value > old_value:
+                self.check_page_edges(self.row_count, bottom)
+            elif new_value < old_value:
+                self.check_page_edges(top, -1)
 
-        mongo_client = MongoClient(MONGO_URI, serverSelectionTimeoutMS=5000, server_api= ServerApi('1')) # Timeout for connection
-        db = mongo_client[MONGO_DATABASE_NAME]
-        video_collection = db[MONGO_COLLECTION_NAME]
+    @on(DataTable.RowHighlighted)
+    def load_pages_near_cursor(self):
+        if self.loads_on_scroll:
+            self.check_page_edges(self.cursor_row, self.cursor_row)
 
-        video_collection.update_one(
-            {"_id": id},
-            {"$set": {"seen": self.videos[row].seen}},
-        )
+    def restyle_crossed(self, old_today_cutoff, old_cutoff):
+        """After a day boundary, re-style only the shown rows that moved to another recency bucket."""
+        for video in self.videos:
+            published_ts = video.published_ts
+            if (old_today_cutoff <= published_ts < NEW_VIDEOS.today_cutoff
+                    or old_cutoff <= published_ts < NEW_VIDEOS.cutoff):
+                self.update_video_row(video)
 
-        if mongo_client:
-            mongo_client.close()
+    def update_video_row(self, video):
+        """Re-render a single row in place, e.g. after its seen flag flipped."""
+        cells = row_cells(video)
+        old_cells = self.shown_cells.get(video.video_id)
+        if old_cells is None:
+            return
+        self.update_changed_cells(video.video_id, old_cells, cells)
+        self.shown_cells[video.video_id] = cells
 
-        self.update_table(self.key)
+    def update_changed_cells(self, video_id, old_cells, cells):
+        for column_key, old_cell, cell in zip(COLUMN_KEYS, old_cells, cells):
+            if cell_changed(old_cell, cell):
+                self.update_cell(video_id, column_key, cell)
+
+    def action_style_row(self):
+        if not self.row_count:
+            return
+        video = self.videos_by_id[self.cursor_video_id()]
+
+        video.seen = not video.seen
+        # written to MongoDB later by MyApp.flush_seen_writes
+        self.app.seen_writes.record(video._id, video.seen, previous=not video.seen)
+        if self.app.persistence is not None:
+            self.app.persistence.mark_seen(self.channel_of(video), video)
+        # the row stays put while toggling down a list sorted by seen; the
+        # next update_table picks the new order up
+        SORT_ORDERS.invalidate(self.channel_of(video), "seen")
+
+        self.update_video_row(video)
+
+    def channel_of(self, video):
+        return self.key
 
     # def action_select_cursor(self):
     #     row, col = self.cursor_row, self.cursor_column
@@ -133,6 +357,140 @@ class CustomDataTable(DataTable):
         self.app.open_url(f"https://www.youtube.com/watch?v={video_id}")
         
 
+class ChannelsTable(CustomDataTable):
+    """Videos of several channels, styled and toggled like CustomDataTable's, with a Channel column."""
+
+    loads_on_scroll = False
+    # rows are shown in the order given, feed or search ranking
+    sortable = False
+
+    def set_videos(self, found):
+        """Show (channel, video) pairs in the given order."""
+        self.clear()
+        if "channel" not in self.columns:
+            self.add_column("Channel", key="channel")
+        self.shown_cells = {}
+        self.videos = []
+        self.videos_by_id = {}
+        self.channels = {}  # video_id -> channel
+        self.add_videos(found)
+
+    def add_videos(self, found):
+        for channel_name, video in found:
+            if video.video_id in self.videos_by_id:
+                continue
+            cells = row_cells(video)
+            self.videos.append(video)
+            self.videos_by_id[video.video_id] = video
+            self.channels[video.video_id] = channel_name
+            self.shown_cells[video.video_id] = cells
+            self.add_row(*cells, channel_name, key=video.video_id)
+
+    def channel_of(self, video):
+        return self.channels[video.video_id]
+
+
+class FeedTable(ChannelsTable):
+    """Every channel's videos newest first, taken from a LatestFeed as the table scrolls."""
+
+    loads_on_scroll = True
+    feed = None
+
+    def start_feed(self, data):
+        self.feed = LatestFeed(data)
+        self.set_videos(self.feed.take(FEED_PAGE_SIZE))
+
+    def check_page_edges(self, first_row, last_row):
+        if self.feed is not None and last_row >= self.row_count - 1 - PAGE_PREFETCH_ROWS:
+            self.add_videos(self.feed.take(FEED_PAGE_SIZE))
+
+
+class FeedScreen(Screen):
+    """The latest videos of all channels in one chronological table."""
+
+    BINDINGS = [
+        Binding("escape", "close", "Back"),
+        Binding("f", "close", "Back", show=False),
+    ]
+
+    def compose(self):
+        yield Footer()
+        yield FeedTable()
+
+    def on_mount(self):
+        table = self.query_one(FeedTable)
+        table.start_feed(DATA)
+        table.focus()
+        self.sub_title = f"Latest videos of {len(DATA)} channels"
+
+    def action_close(self):
+        self.dismiss()
+
+
+class SearchScreen(Screen):
+    """Titles of every channel matching what is typed, searched again on each keystroke."""
+
+    CSS = """
+    #search_input {
+        dock: top;
+    }
+    """
+
+    BINDINGS = [
+        Binding("escape", "close", "Back"),
+        Binding("down", "focus_results", show=False),
+    ]
+
+    def compose(self):
+        yield Footer()
+        yield Input(placeholder="Search titles...", id="search_input")
+        yield ChannelsTable()
+
+    def on_mount(self):
+        self.query_one(ChannelsTable).set_videos([])
+        self.query_one("#search_input", Input).focus()
+        if not SEARCH.ready:
+            self.build_index()
+
+    @work(exclusive=True, group="search_index")
+    async def build_index(self):
+        """Index every title in DATA once, a chunk of channels at a time so typing stays responsive."""
+        self.sub_title = "Indexing titles..."
+        # DATA replaced meanwhile (a reload) clears SEARCH and ends the build, start over on the new one
+        while not SEARCH.ready:
+            for _ in SEARCH.build_steps(DATA):
+                await asyncio.sleep(0)
+        self.sub_title = SEARCH.stats()
+        self.search(self.query_one("#search_input", Input).value)
+
+    @on(Input.Changed, "#search_input")
+    def search_changed(self, event: Input.Changed):
+        if SEARCH.ready:
+            self.search(event.value)
+
+    @work(exclusive=True, group="search")
+    async def search(self, query):
+        """Show the matches of `query`; a newer keystroke cancels this at its next step."""
+        matches = []
+        for matches in SEARCH.search_steps(query, limit=SEARCH_LIMIT):
+            await asyncio.sleep(0)
+        self.query_one(ChannelsTable).set_videos(resolve(DATA, matches))
+        if query.strip():
+            self.sub_title = f"{len(matches)}{'+' if len(matches) == SEARCH_LIMIT else ''} matches"
+        else:
+            self.sub_title = SEARCH.stats()
+
+    @on(Input.Submitted, "#search_input")
+    def search_submitted(self):
+        self.action_focus_results()
+
+    def action_focus_results(self):
+        self.query_one(ChannelsTable).focus()
+
+    def action_close(self):
+        self.dismiss()
+
+
 class MyApp(App):
 
     CSS = """
@@ -146,89 +504,637 @@ class MyApp(App):
 
     BINDINGS = [
         Binding("q", "exit", "Exit"),
-        Binding("l", "focus_datatable", show=False)
+        Binding("l", "focus_datatable", show=False),
+        Binding("f", "latest_feed", "Latest feed"),
+        Binding("slash", "search", "Search"),
         ]
     
     def compose(self):
         yield Footer()
+        yield ProgressBar(show_eta=False)
         with Horizontal():
             yield CustomListView()
             yield CustomDataTable()
 
+    @property
+    def browser(self):
+        """The channel list and table screen, also while the feed screen is on top of it."""
+        return self.screen_stack[0]
+
+    def __init__(self, repository, persistence, lazy=False, paged=False):
+        super().__init__()
+        self.repository = repository
+        # None in lazy mode, where MongoDB is the only copy
+        self.persistence = persistence
+        self.lazy = lazy
+        # channel -> latest published_at from the last summary fetch (lazy mode)
+        self.channel_latest = {}
+        # paged mode browses every video of the shown channel through this
+        self.paged = paged
+        self.pager = None
+        # started once the first data is in, pushes inserted videos into DATA
+        self.live = None
+        # what the videos collection looked like before the last load or sync, None if unknown
+        self.fingerprint = None
+        self.seen_writes = SeenWriteBehind(repository)
+        self.exit_flush_report = None
+        # a full load from MongoDB is running, DATA is partial
+        self.streaming = False
+        self.table_updates = HighlightCoalescer(
+            self, self.show_channel, delay=HIGHLIGHT_DEBOUNCE, max_wait=HIGHLIGHT_MAX_WAIT,
+        )
+        self.prefetcher = NeighbourPrefetcher(self, self.warm_channel, radius=PREFETCH_RADIUS)
+
+    def on_mount(self):
+        self.browser.query_one(ProgressBar).display = False
+        self.set_interval(SEEN_FLUSH_INTERVAL, self.flush_seen_writes)
+        if self.persistence is not None:
+            self.set_interval(JOURNAL_FLUSH_INTERVAL, self.flush_journal)
+        CLOCK.subscribe(self.start_new_day)
+        CLOCK.start(self)
+        if self.lazy:
+            self.load_channel_summaries()
+        elif not DATA:
+            self.stream_data_from_db()
+        else:
+            # already on screen from the cache, check it against MongoDB behind the UI
+            self.revalidate_cache()
+
+    @work(group="seen")
+    async def flush_seen_writes(self):
+        report = await self.seen_writes.flush()
+        if report is not None:
+            self.report_flush(report)
+
+    def flush_journal(self):
+        # only the encoding happens here; the write and fsync run on a thread
+        if self.persistence.take(DATA):
+            self.write_journal()
+        # not while DATA is still streaming in, the next flush after it will do
+        if self.streaming or self.persistence.compacting:
+            return
+        if self.persistence.needs_compaction():
+            # the thread gets the channel lists as they are now, DATA keeps changing under it
+            self.compact_cache(snapshot_items(DATA))
+
+    @work(thread=True, group="journal", exit_on_error=False)
+    def write_journal(self):
+        try:
+            written = self.persistence.write_pending()
+        except Exception as e:
+            # the records stay pending, the next flush tries again
+            self.call_from_thread(self.notify, f"Could not journal cache changes: {e}", severity="error")
+        else:
+            if written:
+                self.call_from_thread(self.log, f"Journaled {written} bytes of cache changes")
+
+    @work(thread=True, exclusive=True, group="compact", exit_on_error=False)
+    def compact_cache(self, items):
+        try:
+            self.persistence.compact(items)
+        except Exception as e:
+            # the journal still holds everything, the next flush tries again
+            self.call_from_thread(self.notify, f"Could not compact the cache: {e}", severity="error")
+
+    async def on_unmount(self):
+        CLOCK.stop()
+        CLOCK.unsubscribe(self.start_new_day)
+        # whatever is still queued goes out before the repository closes
+        self.exit_flush_report = await self.seen_writes.flush()
+
+    def start_new_day(self, previous, today):
+        """CLOCK callback at midnight: move the cutoffs and update only what crossed them."""
+        old_today_cutoff, old_cutoff = NEW_VIDEOS.today_cutoff, NEW_VIDEOS.cutoff
+        changed = NEW_VIDEOS.advance_day(today)
+        if self.lazy:
+            # unloaded channels only have server counts, which are re-aggregated
+            self.load_channel_summaries()
+        else:
+            self.browser.query_one(CustomListView).refresh_channels(changed)
+        self.browser.query_one(CustomDataTable).restyle_crossed(old_today_cutoff, old_cutoff)
+        self.log(f"New day {today}: {len(changed)} channel counts changed")
+
+    def report_flush(self, report):
+        if report.error is not None:
+            self.notify(
+                f"Could not save {report.writes} seen change(s), will retry: {report.error}",
+                severity="error",
+            )
+        else:
+            self.log(f"Flushed {report.writes} seen change(s) in {report.seconds * 1000:.1f} ms")
+
+    @work(exclusive=True, group="load")
+    async def load_channel_summaries(self):
+        """Lazy mode: fetch only channel names and new-video counts, aggregated server side."""
+        global DATA
+        # the summaries cover everything inserted before this
+        loaded_up_to = ObjectId.from_datetime(datetime.now(timezone.utc))
+        await self.record_fingerprint()
+        try:
+            summaries = await self.repository.fetch_channel_summaries(NEW_VIDEOS.cutoff_datetime)
+        except Exception as e:
+            self.fingerprint = None
+            self.notify(f"Could not load channels from MongoDB: {e}", severity="error")
+            return
+        summaries = [summary for summary in summaries if summary["_id"] is not None]
+
+        previous = DATA if isinstance(DATA, ChannelLRU) else None
+        DATA = ChannelLRU((summary["_id"] for summary in summaries), LAZY_CACHE_BYTES, on_unload=forget_watermark)
+        SEARCH.clear()
+        SORT_ORDERS.clear()
+        RAW_WATERMARKS.clear()
+        if previous is not None:
+            for channel_name in previous:
+                if channel_name not in DATA:
+                    NEW_VIDEOS.remove_channel(channel_name)
+        for summary in summaries:
+            channel_name = summary["_id"]
+            NEW_VIDEOS.set_count(channel_name, summary["new_videos"])
+            # keep videos already loaded for channels that got nothing newer
+            if (previous is not None and previous.is_loaded(channel_name)
+                    and self.channel_latest.get(channel_name) == summary["latest"]):
+                DATA[channel_name] = previous[channel_name]
+        self.channel_latest = {summary["_id"]: summary["latest"] for summary in summaries}
+        self.browser.query_one(CustomListView).update_data()
+        self.notify(f"Loaded {len(DATA)} channels")
+        self.start_live_updates(loaded_up_to)
+
+    @work(exclusive=True, group="channel")
+    async def load_channel(self, key):
+        """Lazy mode: fetch one channel's videos when it is highlighted."""
+        table = self.browser.query_one(CustomDataTable)
+        try:
+            docs = await self.repository.fetch_channel_videos(key, limit=LATEST_N)
+        except Exception as e:
+            self.notify(f"Could not load {key} from MongoDB: {e}", severity="error")
+            return
+        finally:
+            table.loading = False
+        DATA[key] = [video_from_doc(doc) for doc in docs]
+        SEARCH.set_channel(key, DATA)
+        self.log(f"lazy channels: {DATA.stats()}")
+        list_view = self.browser.query_one(CustomListView)
+        if list_view.highlighted_entry is not None and list_view.highlighted_entry.data == key:
+            table.update_table(key)
+
+    @work(exclusive=True, group="channel")
+    async def open_channel_pages(self, key):
+        """Paged mode: show a channel's newest page; the table asks for more as it scrolls."""
+        table = self.browser.query_one(CustomDataTable)
+        pager = KeysetPager(self.repository, key, page_size=PAGE_SIZE, max_pages=PAGE_WINDOW)
+        table.loading = True
+        try:
+            await pager.load_older()
+        except Exception as e:
+            self.notify(f"Could not load {key} from MongoDB: {e}", severity="error")
+            return
+        finally:
+            table.loading = False
+        self.pager = pager
+        table.update_table(key, pager.videos)
+
+    @work(group="page")
+    async def load_page(self, pager, older):
+        try:
+            changed = await (pager.load_older() if older else pager.load_newer())
+        except Exception as e:
+            self.notify(f"Could not load more of {pager.channel} from MongoDB: {e}", severity="error")
+            return
+        # the user may have moved to another channel meanwhile
+        if changed and pager is self.pager:
+            self.browser.query_one(CustomDataTable).update_table(pager.channel, pager.videos)
+            self.log(f"pages: {pager.stats()}")
+
+    @work(exclusive=True, group="refresh")
+    async def refresh_from_db(self, full=False):
+        """r/R: look at the collection's fingerprint before fetching anything.
+
+        Nothing changed: nothing is fetched. Only inserts: a delta sync fetches
+        just the new videos and touches only their channels. Deletes (or no
+        baseline yet) with `full`: everything is reloaded.
+        """
+        if self.streaming:
+            # a refresh would cancel the load and leave DATA half filled
+            self.notify("Still loading from MongoDB")
+            return
+        try:
+            fingerprint = await self.repository.fetch_fingerprint()
+        except Exception as e:
+            self.notify(f"Could not reach MongoDB: {e}", severity="error")
+            return
+        if self.fingerprint is not None and fingerprint == self.fingerprint:
+            self.notify("Already up to date")
+        elif full and (self.fingerprint is None or not fingerprint.only_grew_since(self.fingerprint)):
+            self.stream_data_from_db()
+        else:
+            self.sync_data_from_db()
+
+    async def record_fingerprint(self):
+        """Remember the collection's fingerprint before loading from it, so later changes show up."""
+        try:
+            self.fingerprint = await self.repository.fetch_fingerprint()
+        except Exception:
+            self.fingerprint = None
+
+    @work(exclusive=True, group="revalidate")
+    async def revalidate_cache(self):
+        """Compare the cached channels with MongoDB and patch only those that changed.
+
+        One aggregation returns each channel's newest published_at; a channel
+        whose newest cached video differs is refetched, one the server no
+        longer has is dropped. Channels stay marked stale until this finishes,
+        however it finishes.
+        """
+        loaded_up_to = None
+        try:
+            loaded_up_to = await self.patch_stale_channels()
+        except Exception as e:
+            self.fingerprint = None
+            self.notify(f"Could not revalidate the cache, showing it as saved: {e}", severity="warning")
+        finally:
+            # when a full load cancelled this it has reset all of these itself
+            if not self.streaming:
+                STALENESS.mark_all_fresh()
+                self.browser.query_one(CustomListView).update_data()
+                self.start_live_updates(loaded_up_to)
+
+    async def patch_stale_channels(self):
+        """Refetch the changed channels and drop the removed ones; returns the ObjectId it covers."""
+        loaded_up_to = ObjectId.from_datetime(datetime.now(timezone.utc))
+        await self.record_fingerprint()
+        summaries = await self.repository.fetch_channel_summaries()
+        server_latest = {summary["_id"]: summary["latest"] for summary in summaries if summary["_id"] is not None}
+        _, watermarks = data_watermarks(DATA)
+        changed = [name for name, latest in server_latest.items() if watermarks.get(name) != latest]
+        removed = [name for name in DATA if name not in server_latest]
+        # the rest are confirmed as cached already
+        unchanged = [name for name in DATA if name in server_latest and watermarks.get(name) == server_latest[name]]
+        for channel_name in unchanged:
+            STALENESS.mark_fresh(channel_name)
+        self.browser.query_one(CustomListView).refresh_channels(unchanged)
+
+        fetched = await asyncio.gather(
+            *(self.repository.fetch_channel_videos(name, limit=LATEST_N) for name in changed)
+        )
+        for channel_name, docs in zip(changed, fetched):
+            DATA[channel_name] = [video_from_doc(doc) for doc in docs]
+            STALENESS.mark_fresh(channel_name)
+            self.persistence.mark_channel(channel_name)
+            SEARCH.set_channel(channel_name, DATA)
+        for channel_name in removed:
+            del DATA[channel_name]
+            STALENESS.mark_fresh(channel_name)
+            self.persistence.mark_channel(channel_name)
+            NEW_VIDEOS.remove_channel(channel_name)
+            SEARCH.remove_channel(channel_name)
+            forget_watermark(channel_name)
+
+        table = self.browser.query_one(CustomDataTable)
+        if getattr(table, "key", None) in changed:
+            table.update_table(table.key)
+        self.log(f"Revalidated {len(server_latest)} channels: {len(changed)} changed, {len(removed)} removed")
+        return loaded_up_to
+
+    @work(exclusive=True, group="load")
+    async def stream_data_from_db(self):
+        """Fill DATA and the channel list batch by batch while the UI stays live."""
+        if self.lazy:
+            self.load_channel_summaries()
+            return
+        self.start_loading()
+        # the view covers everything inserted before this
+        loaded_up_to = ObjectId.from_datetime(datetime.now(timezone.utc))
+        await self.record_fingerprint()
+        try:
+            async for batch in iter_channel_batches(self.repository):
+                self.add_channels(batch)
+        except Exception as e:
+            self.fingerprint = None
+            self.notify(f"Could not load data from MongoDB: {e}", severity="error")
+        finally:
+            self.finish_loading(loaded_up_to)
+
+    @work(exclusive=True, group="sync")
+    async def sync_data_from_db(self):
+        global DATA
+        if self.lazy:
+            # counts are cheap to re-aggregate; changed channels are refetched on highlight
+            self.load_channel_summaries()
+            return
+        if not DATA:
+            self.stream_data_from_db()
+            return
+        await self.record_fingerprint()
+        try:
+            synced = await sync_data_from_db(self.repository, DATA)
+        except Exception as e:
+            self.fingerprint = None
+            self.notify(f"Could not sync from MongoDB: {e}", severity="error")
+            return
+        if synced is None:
+            # nothing to diff against
+            self.stream_data_from_db()
+            return
+        fetched, touched = synced
+        self.show_new_videos(touched)
+        self.notify(f"Delta sync: {fetched} new documents, {len(touched)} channels changed")
+
+    def show_new_videos(self, touched):
+        """Relabel and re-index the channels that gained videos, and the table if it shows one."""
+        for channel_name in touched:
+            if self.persistence is not None:
+                self.persistence.mark_channel(channel_name)
+            NEW_VIDEOS.set_channel(channel_name, DATA[channel_name])
+            SEARCH.set_channel(channel_name, DATA)
+            # merged into the same list in place
+            SORT_ORDERS.invalidate(channel_name)
+        self.browser.query_one(CustomListView).refresh_channels(touched)
+        # the highlighted channel's table may have gained rows
+        table = self.browser.query_one(CustomDataTable)
+        if getattr(table, "key", None) in touched:
+            table.update_table(table.key)
+
+    def start_live_updates(self, since_id=None):
+        """Start pushing videos inserted into MongoDB into DATA, unless already running."""
+        if self.live is not None:
+            return
+        if since_id is None:
+            since_id = high_water_id(DATA)
+        self.live = LiveUpdates(
+            self.repository, self.apply_live_videos, since_id=since_id,
+            projection={**video_projection(), CHANNEL_FIELD: 1}, poll_interval=LIVE_POLL_INTERVAL,
+        )
+        self.run_worker(self.live.run, group="live", exclusive=True, exit_on_error=False)
+
+    def apply_live_videos(self, docs):
+        """LiveUpdates callback: merge inserted videos without reloading anything else."""
+        if self.lazy:
+            self.apply_live_videos_lazy(docs)
+        else:
+            touched = merge_new_videos(DATA, docs)
+            self.show_new_videos(touched)
+        self.log(f"live updates: {self.live.stats()}")
+
+    def apply_live_videos_lazy(self, docs):
+        # counts are bumped in place; loaded channels are dropped and refetched when shown
+        touched = set()
+        for doc in docs:
+            channel_name = doc.get(CHANNEL_FIELD)
+            if channel_name is None:
+                continue
+            DATA.add_channel(channel_name)
+            NEW_VIDEOS.add_video(channel_name, video_from_doc(doc))
+            touched.add(channel_name)
+        for channel_name in touched:
+            DATA.unload(channel_name)
+            SEARCH.remove_channel(channel_name)
+        self.browser.query_one(CustomListView).refresh_channels(touched)
+        table = self.browser.query_one(CustomDataTable)
+        if getattr(table, "key", None) in touched:
+            if not self.paged:
+                self.show_channel(table.key)
+            elif self.pager is not None and self.pager.at_start:
+                # only when the newest page is on screen, not while deep in the back catalogue
+                self.pager = None
+                self.show_channel(table.key)
+
+    def start_loading(self):
+        global DATA
+        DATA = {}
+        self.streaming = True
+        # a delta sync or revalidation still running would patch the DATA being replaced
+        self.workers.cancel_group(self, "sync")
+        self.workers.cancel_group(self, "revalidate")
+        self.persistence.mark_reset()
+        STALENESS.mark_all_fresh()
+        NEW_VIDEOS.build(DATA)
+        SEARCH.clear()
+        SORT_ORDERS.clear()
+        RAW_WATERMARKS.clear()
+        self.browser.query_one(CustomListView).clear()
+        progress = self.browser.query_one(ProgressBar)
+        progress.update(total=None, progress=0)
+        progress.display = True
+
+    def add_channels(self, batch):
+        DATA.update(batch)
+        for channel_name, videos in batch:
+            self.persistence.mark_channel(channel_name)
+            NEW_VIDEOS.set_channel(channel_name, videos)
+            SEARCH.set_channel(channel_name, DATA)
+            # a batch at a time now rather than all of DATA on the next sync
+            raw_channel_watermark(DATA, channel_name)
+        self.browser.query_one(ProgressBar).advance(len(batch))
+        self.browser.query_one(CustomListView).append_channels(name for name, _ in batch)
+
+    def finish_loading(self, loaded_up_to):
+        self.streaming = False
+        self.browser.query_one(ProgressBar).display = False
+        self.notify(f"Loaded {len(DATA)} channels")
+        if DATA:
+            self.start_live_updates(loaded_up_to)
+
+    def action_latest_feed(self):
+        if self.screen is not self.browser:
+            return
+        if self.lazy or self.paged:
+            self.notify("The feed only covers the videos loaded so far")
+        self.push_screen(FeedScreen(), self.after_overlay)
+
+    def action_search(self):
+        if self.screen is not self.browser:
+            return
+        if self.lazy or self.paged:
+            self.notify("Search only covers the videos loaded so far")
+        self.push_screen(SearchScreen(), self.after_overlay)
+
+    def after_overlay(self, result=None):
+        # the feed and search share Video objects with DATA, re-render rows toggled there
+        table = self.browser.query_one(CustomDataTable)
+        if table.row_count:
+            table.update_table(table.key, table.videos)
+
     def action_exit(self):
         self.exit()
 
     def action_focus_datatable(self):
-        if self.query_one(CustomListView).has_focus:
-            self.query_one(CustomDataTable).focus()
+        if self.browser.query_one(CustomListView).has_focus:
+            self.browser.query_one(CustomDataTable).focus()
         else:
-            self.query_one(CustomListView).focus()
+            self.browser.query_one(CustomListView).focus()
 
-    @on(ListView.Highlighted)
-    def update_data_table(self, event: ListView.Highlighted):
+    @on(ChannelList.Highlighted)
+    def update_data_table(self, event: ChannelList.Highlighted):
         self.log(event.item)
         if event.item is not None:
-            self.log(event.item.data)
-            self.query_one(CustomDataTable).update_table(event.item.data)
+            self.table_updates.submit(event.item.data)
+
+    def show_channel(self, key):
+        table = self.browser.query_one(CustomDataTable)
+        if self.paged:
+            if key in DATA and (self.pager is None or self.pager.channel != key):
+                self.open_channel_pages(key)
+        elif isinstance(DATA, ChannelLRU) and key in DATA and not DATA.is_loaded(key):
+            table.loading = True
+            self.load_channel(key)
+        elif key in DATA:
+            table.loading = False
+            table.update_table(key)
+        self.log(f"table updates: {self.table_updates.stats()}, row cells: {ROW_CELLS.stats()}, sort orders: {SORT_ORDERS.stats()}")
+        list_view = self.browser.query_one(CustomListView)
+        self.prefetcher.schedule(list_view.entries, list_view.index)
+
+    def warm_channel(self, entry):
+        # decodes the channel if it is still only in the snapshot, then builds its rows
+        if self.paged or isinstance(DATA, ChannelLRU) and not DATA.is_loaded(entry.data):
+            return
+        if entry.data in DATA:
+            for video in DATA[entry.data]:
+                row_cells(video)
+
+
+def row_cells(video):
+    """The (Time, Title, Duration) cells for one video row, built once per version of what they show."""
+    bucket = recency_bucket(video)
+    # an edited title or duration is a new key, so a refetched video never shows old cells
+    key = (video.video_id, video.published_ts, video.title, video.duration, video.seen, bucket)
+    return ROW_CELLS.get(key, lambda: build_row_cells(video, bucket))
 
-def is_within_last_two_days(dt: datetime) -> bool:
-    now = datetime.now()
-    two_days_ago =  now - timedelta(days=2)
-    return two_days_ago.date() <= dt.date() 
-    
 
-def load_data_from_db():
-    # with open("data.pkl", "rb") as f:
-    #     loaded_data = pickle.load(f)
+def cell_changed(old_cell, cell):
+    """Whether a cell renders differently; Text equality ignores the style, which is what a toggle changes."""
+    if old_cell is cell:
+        return False
+    if isinstance(old_cell, Text) and isinstance(cell, Text):
+        return old_cell.plain != cell.plain or old_cell.style != cell.style or old_cell.spans != cell.spans
+    return type(old_cell) is not type(cell) or old_cell != cell
 
-    print(f"Connecting to MongoDB at {MONGO_URI}...")
-    mongo_client = MongoClient(MONGO_URI, serverSelectionTimeoutMS=5000, server_api= ServerApi('1')) # Timeout for connection
-    # Ping to confirm connection
-    mongo_client.admin.command('ping') 
-    print("Successfully connected to MongoDB.")
 
-    db = mongo_client[MONGO_DATABASE_NAME]
-    video_collection = db[MONGO_COLLECTION_NAME]
+def recency_bucket(video):
+    """TODAY, RECENT (within the new-video window) or OLDER, against NEW_VIDEOS' day cutoffs."""
+    if video.published_ts >= NEW_VIDEOS.today_cutoff:
+        return TODAY
+    if video.published_ts >= NEW_VIDEOS.cutoff:
+        return RECENT
+    return OLDER
 
+
+def build_row_cells(video, bucket):
+    style = "dim" if video.seen else TITLE_STYLES[bucket]
+    title = Text(video.title, style=style) if style else video.title
+    # formatted here so the DataTable does not stringify a datetime on every render
+    return (f"{video.published_at:%Y-%m-%d %H:%M:%S}", title, video.duration)
+
+
+async def iter_channel_batches(repository, batch_size=BATCH_SIZE):
+    """Stream the latest_20 view as lists of (channel_name, videos), one list per cursor batch."""
     # loaded_data = list(db.latest_ten.find())
-    loaded_data = list(db.latest_20.find())
+    # every video is turned into a Video straight away, so plain dicts decode faster than raw BSON here
+    projection = video_projection("latest_videos.")
+    async for items in repository.iter_view_batches("latest_20", batch_size=batch_size, projection=projection):
+        yield [(item["_id"], [video_from_doc(video) for video in item["latest_videos"]]) for item in items]
+
+
+async def sync_data_from_db(repository, data):
+    """Fetch only the videos newer than what `data` already holds and merge them in.
+
+    Uses the max `_id` over the whole cache as the query watermark; videos
+    live updates merged already are skipped by `_id`. Returns (documents
+    fetched, channels that changed), or None when there is nothing to diff
+    against and a full reload is needed instead.
+    """
+    since_id = high_water_id(data)
+    if since_id is None:
+        return None
+
+    new_docs = await repository.fetch_videos(
+        {"_id": {"$gt": since_id}}, projection={**video_projection(), CHANNEL_FIELD: 1},
+    )
+
+    return len(new_docs), merge_new_videos(data, new_docs)
 
-    data = dict()
-    field_names = {f.name for f in fields(Video)}
 
-    for item in loaded_data:
-        channel_name = item["_id"]
-        videos = []
+def high_water_id(data):
+    """Max `_id` over all videos of `data`, None when it holds none."""
+    if isinstance(data, SnapshotData):
+        # undecoded channels are as saved, so the snapshot's newest _id covers them; it
+        # still counts when its channel was dropped since, everything older was saved too
+        raw_ids = [data.snapshot.max_raw_id]
+        channel_names = data.decoded_channels()
+    else:
+        raw_ids = []
+        channel_names = data
+    raw_ids += (raw_channel_watermark(data, channel_name)[0] for channel_name in channel_names)
+    raw_ids = [raw_id for raw_id in raw_ids if raw_id is not None]
+    return ObjectId(max(raw_ids)) if raw_ids else None
+
+
+def data_watermarks(data):
+    """Return (max `_id` over all videos, {channel: max `published_at`})."""
+    high_water_id = None
+    watermarks = {}
+    for channel_name in data:
+        raw_id, published_ts = raw_channel_watermark(data, channel_name)
+        if raw_id is None:
+            continue
+        if high_water_id is None or raw_id > high_water_id:
+            high_water_id = raw_id
+        watermarks[channel_name] = from_micros(published_ts)
+    return (None if high_water_id is None else ObjectId(high_water_id)), watermarks
 
-        for video in item["latest_videos"]:
-            filtered_data = {k:v for k,v in video.items() if k in field_names}
-            videos.append(Video(**filtered_data))
 
-        data[channel_name] = videos
+def raw_channel_watermark(data, channel_name):
+    """(max raw `_id`, max published_ts) of one channel, (None, None) when it has no videos."""
+    if isinstance(data, SnapshotData) and not data.is_decoded(channel_name):
+        # read off the snapshot's per-channel columns so undecoded channels stay undecoded
+        return data.snapshot.raw_watermark(channel_name)
+    videos = data[channel_name]
+    cached = RAW_WATERMARKS.get(channel_name)
+    if cached is None or cached[0] is not videos:
+        cached = RAW_WATERMARKS[channel_name] = (videos, raw_video_watermark(videos))
+    return cached[1]
 
-    if mongo_client:
-        mongo_client.close()
-        print("\nMongoDB connection closed.")
 
-    return data
+def forget_watermark(channel_name):
+    """Drop a channel's cached raw watermark once its videos leave DATA."""
+    RAW_WATERMARKS.pop(channel_name, None)
 
 
-@dataclass
-class Video:
-    _id: ObjectId
-    title: str
-    video_id: str
-    published_at: datetime
-    url: str = field(default="N/A")
-    duration: str = field(default="N/A")
-    seen: bool = field(default=False)
+def merge_new_videos(data, docs) -> set:
+    """Merge raw video documents into `data`, newest first, capped at LATEST_N per channel.
+
+    Documents whose `_id` the channel already holds are skipped, so an insert
+    that reaches us twice (a change stream and its catch-up poll, or live
+    updates and a sync) is merged once. Returns the channels that received videos.
+    """
+    touched = set()
+    known_ids = {}  # channel -> raw _ids it holds
+    for doc in docs:
+        channel_name = doc.get(CHANNEL_FIELD)
+        if channel_name is None:
+            continue
+        videos = data.get(channel_name, ())
+        known = known_ids.get(channel_name)
+        if known is None:
+            known = known_ids[channel_name] = {video._oid for video in videos}
+        raw_id = doc["_id"].binary
+        if raw_id in known:
+            continue
+        known.add(raw_id)
+        data.setdefault(channel_name, []).append(video_from_doc(doc))
+        touched.add(channel_name)
+
+    for channel_name in touched:
+        videos = data[channel_name]
+        videos.sort(key=lambda v: v.published_at, reverse=True)
+        del videos[LATEST_N:]
+        RAW_WATERMARKS.pop(channel_name, None)
+
+    return touched
 
-def pickle_data(data):
-    with open("data.pkl", "wb") as f:
-        pickle.dump(data, f)
 
 def load_pickle_data():
-    with open("data.pkl", "rb") as f:
+    with open(PICKLE_PATH, "rb") as f:
         loaded_data = pickle.load(f)
 
     return loaded_data
@@ -236,23 +1142,51 @@ def load_pickle_data():
 
 if __name__ == "__main__":
     # Load environment variables from .env file
-    load_dotenv()  
+    load_dotenv()
 
     # --- MongoDB Configuration ---
-    MONGO_URI = os.getenv("MONGO_URI")
-    MONGO_DATABASE_NAME = "youtube_data"
-    MONGO_COLLECTION_NAME = "videos"     
+    repository = get_repository(os.getenv("MONGO_URI"))
 
     # --- Get init data logic ---
-    file_path = Path("data.pkl")
-    if file_path.exists():
+    # --lazy: fetch channel names and counts at startup, videos only when a channel is highlighted
+    # --paged: like --lazy, but the table pages through each channel's whole back catalogue
+    PAGED = "--paged" in sys.argv[1:]
+    LAZY = PAGED or "--lazy" in sys.argv[1:]
+    persistence = None if LAZY else CachePersistence(SNAPSHOT_PATH)
+    if LAZY:
+        DATA = {}
+    elif persistence.exists():
+        # shown straight away, revalidated against MongoDB once the app is up
+        DATA = persistence.load()
+        STALENESS.mark_cached(DATA, persistence.saved_at())
+    elif PICKLE_PATH.exists():
         DATA = load_pickle_data()
+        STALENESS.mark_cached(DATA, PICKLE_PATH.stat().st_mtime)
+        persistence.mark_reset()
+        for channel_name in DATA:
+            persistence.mark_channel(channel_name)
     else:
-        DATA = load_data_from_db()
+        # MyApp streams it in from a worker after the first frame
+        DATA = {}
 
     # --- Run TUI ---
-    app = MyApp()
+    app = MyApp(repository, persistence, lazy=LAZY, paged=PAGED)
     app.run()
+    repository.close()
+
+    # --- Report seen toggles flushed on exit ---
+    report = app.exit_flush_report
+    if report is not None:
+        if report.error is not None:
+            print(f"Could not save {report.writes} seen change(s): {report.error}")
+        else:
+            print(f"Saved {report.writes} seen change(s) in {report.seconds * 1000:.1f} ms")
 
     # --- Save data ---
-    pickle_data(DATA)
\ No newline at end of file
+    # only what changed since the last journal flush; compacting is left to the
+    # next run's background worker unless there is no snapshot yet; compact()
+    # waits for a compaction thread the app left running
+    if persistence is not None:
+        persistence.flush(DATA)
+        if not SNAPSHOT_PATH.exists():
+            persistence.compact(DATA)
@@ -0,0 +1 @@
+"""Shared building blocks for the video browser apps (`main.py`, `tmp/list_main_external_data.py`)."""
@@ -0,0 +1,196 @@
+from typing import Any, Iterable, Optional
+
+from rich.segment import Segment
+from textual import events
+from textual.binding import Binding
+from textual.geometry import Region, Size
+from textual.message import Message
+from textual.reactive import reactive
+from textual.scroll_view import ScrollView
+from textual.strip import Strip
+
+
+class ChannelEntry:
+    """One row of a ChannelList: whatever the app keys the channel on plus the text to show."""
+
+    def __init__(self, data: Any, label: str) -> None:
+        self.data = data
+        self.label = label
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.label!r})"
+
+
+class ChannelList(ScrollView, can_focus=True):
+    """A virtualized replacement for a ListView of channels.
+
+    Rows are plain ChannelEntry objects held in a list; nothing is mounted per
+    row and only the lines inside the viewport are rendered. Highlighting and
+    selection post `Highlighted` / `Selected` messages shaped like the
+    ListView ones, so `event.item` is the ChannelEntry (or None).
+    """
+
+    DEFAULT_CSS = """
+    ChannelList {
+        background: $surface;
+        height: 1fr;
+
+        & > .channel-list--highlight {
+            color: $block-cursor-blurred-foreground;
+            background: $block-cursor-blurred-background;
+            text-style: $block-cursor-blurred-text-style;
+        }
+
+        &:focus {
+            background-tint: $foreground 5%;
+            & > .channel-list--highlight {
+                color: $block-cursor-foreground;
+                background: $block-cursor-background;
+                text-style: $block-cursor-text-style;
+            }
+        }
+    }
+    """
+
+    COMPONENT_CLASSES = {"channel-list--highlight"}
+
+    BINDINGS = [
+        Binding("enter", "select_cursor", "Select", show=False),
+        Binding("up", "cursor_up", "Cursor up", show=False),
+        Binding("down", "cursor_down", "Cursor down", show=False),
+        Binding("home", "first", "First", show=False),
+        Binding("end", "last", "Last", show=False),
+        Binding("pageup", "page_up", "Page up", show=False),
+        Binding("pagedown", "page_down", "Page down", show=False),
+    ]
+
+    index = reactive[Optional[int]](None, init=False)
+
+    class Highlighted(Message):
+        """Posted when the highlighted entry changes."""
+
+        def __init__(self, channel_list: "ChannelList", item: ChannelEntry | None) -> None:
+            super().__init__()
+            self.channel_list = channel_list
+            self.item = item
+
+        @property
+        def control(self) -> "ChannelList":
+            return self.channel_list
+
+    class Selected(Message):
+        """Posted when an entry is selected with enter or a click."""
+
+        def __init__(self, channel_list: "ChannelList", item: ChannelEntry) -> None:
+            super().__init__()
+            self.channel_list = channel_list
+            self.item = item
+
+        @property
+        def control(self) -> "ChannelList":
+            return self.channel_list
+
+    def __init__(self, *, name: str | None = None, id: str | None = None, classes: str | None = None) -> None:
+        super().__init__(name=name, id=id, classes=classes)
+        self._entries: list[ChannelEntry] = []
+
+    @property
+    def entries(self) -> list[ChannelEntry]:
+        return self._entries
+
+    @property
+    def highlighted_entry(self) -> ChannelEntry | None:
+        if self.index is None:
+            return None
+        return self._entries[self.index]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def set_entries(self, entries: Iterable[ChannelEntry]) -> None:
+        """Replace every row, keeping the cursor on the same position if it still exists."""
+        old_index = self.index
+        self._entries = list(entries)
+        self._update_virtual_size()
+        self.index = None
+        if self._entries:
+            self.index = min(old_index or 0, len(self._entries) - 1)
+        self.refresh()
+
+    def append_entries(self, entries: Iterable[ChannelEntry]) -> None:
+        self._entries.extend(entries)
+        self._update_virtual_size()
+        if self.index is None and self._entries:
+            self.index = 0
+        self.refresh()
+
+    def clear(self) -> None:
+        self.set_entries([])
+
+    def refresh_entry(self, index: int) -> None:
+        """Repaint one row after its entry's label changed."""
+        self.refresh(Region(0, index - self.scroll_offset.y, self.size.width, 1))
+
+    def _update_virtual_size(self) -> None:
+        self.virtual_size = Size(self.scrollable_content_region.width, len(self._entries))
+
+    def _on_resize(self, event: events.Resize) -> None:
+        self._update_virtual_size()
+
+    def render_line(self, y: int) -> Strip:
+        width = self.scrollable_content_region.width
+        index = self.scroll_offset.y + y
+        base_style = self.rich_style
+        if index >= len(self._entries):
+            return Strip.blank(width, base_style)
+
+        style = base_style
+        if index == self.index:
+            style = base_style + self.get_component_rich_style("channel-list--highlight")
+        strip = Strip([Segment(f" {self._entries[index].label}", style)])
+        return strip.crop_extend(self.scroll_offset.x, self.scroll_offset.x + width, style)
+
+    def validate_index(self, index: int | None) -> int | None:
+        if index is None or not self._entries:
+            return None
+        return max(0, min(index, len(self._entries) - 1))
+
+    def watch_index(self, old_index: int | None, new_index: int | None) -> None:
+        if new_index is not None:
+            self.scroll_to_region(Region(0, new_index, 1, 1), animate=False, immediate=True)
+        self.refresh()
+        self.post_message(self.Highlighted(self, self.highlighted_entry))
+
+    def action_cursor_up(self) -> None:
+        if self.index is not None:
+            self.index -= 1
+
+    def action_cursor_down(self) -> None:
+        if self.index is None:
+            self.index = 0
+        else:
+            self.index += 1
+
+    def action_first(self) -> None:
+        self.index = 0
+
+    def action_last(self) -> None:
+        self.index = len(self._entries) - 1
+
+    def action_page_up(self) -> None:
+        if self.index is not None:
+            self.index -= self.scrollable_content_region.height
+
+    def action_page_down(self) -> None:
+        if self.index is not None:
+            self.index += self.scrollable_content_region.height
+
+    def action_select_cursor(self) -> None:
+        if self.index is not None:
+            self.post_message(self.Selected(self, self._entries[self.index]))
+
+    def _on_click(self, event: events.Click) -> None:
+        index = self.scroll_offset.y + event.y
+        if index < len(self._entries):
+            self.index = index
+            self.action_select_cursor()
@@ -0,0 +1,58 @@
+from datetime import date, datetime, time, timedelta
+
+
+class DayClock:
+    """Today's date for the whole app, moved forward by one timer at each midnight.
+
+    Everything that buckets videos by day (new-video counts, row colours)
+    reads `today` from here and derives its cutoffs when it changes, instead
+    of asking for the date per video. `start(app)` arms a single timer for
+    the next day boundary; when it fires, each subscriber is called with
+    (previous, today) and the timer is re-armed for the following midnight.
+    """
+
+    def __init__(self, today: date | None = None):
+        self.today = today or date.today()
+        self._subscribers = []
+        self._app = None
+        self._timer = None
+
+    def subscribe(self, callback):
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def start(self, app):
+        self._app = app
+        self._schedule()
+
+    def stop(self):
+        if self._timer is not None:
+            self._timer.stop()
+            self._timer = None
+        self._app = None
+
+    @staticmethod
+    def seconds_until_midnight(now: datetime | None = None) -> float:
+        now = now or datetime.now()
+        midnight = datetime.combine(now.date() + timedelta(days=1), time.min)
+        return (midnight - now).total_seconds()
+
+    def _schedule(self):
+        # a second late rather than early, so the date has really changed when it fires
+        self._timer = self._app.set_timer(self.seconds_until_midnight() + 1, self._tick)
+
+    def _tick(self):
+        self.advance(date.today())
+        if self._app is not None:
+            self._schedule()
+
+    def advance(self, today: date):
+        """Move to `today` and notify subscribers; a no-op when the date has not changed."""
+        if today == self.today:
+            return
+        previous, self.today = self.today, today
+        for callback in list(self._subscribers):
+            callback(previous, today)
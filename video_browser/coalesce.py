@@ -0,0 +1,71 @@
+from time import monotonic
+
+
+class HighlightCoalescer:
+    """Collapses a burst of highlight-driven updates into the latest target.
+
+    The first highlight after a quiet period is applied straight away. While
+    highlights keep arriving (a held `j`/`k`) only the latest target is kept
+    and applied once `delay` seconds pass without a new one, or at the latest
+    `max_wait` seconds after the burst began, so the pane never lags behind by
+    more than that. Targets replaced before they were applied count as
+    dropped. `callback` should cancel any stale in-flight work itself, e.g.
+    by starting an exclusive worker.
+    """
+
+    def __init__(self, owner, callback, delay=0.05, max_wait=0.2):
+        self._owner = owner  # anything with set_timer, e.g. the App
+        self._callback = callback
+        self.delay = delay
+        self.max_wait = max_wait
+        self._timer = None
+        self._target = None
+        self._burst_started = 0.0
+        self._last_applied = float("-inf")
+        self.submitted = 0
+        self.applied = 0
+
+    @property
+    def pending(self) -> bool:
+        return self._timer is not None
+
+    @property
+    def dropped(self) -> int:
+        return self.submitted - self.applied - (1 if self.pending else 0)
+
+    def submit(self, target):
+        self.submitted += 1
+        self._target = target
+        now = monotonic()
+
+        if self._timer is None:
+            if now - self._last_applied >= self.delay:
+                self._apply()
+                return
+            self._burst_started = now
+        else:
+            self._timer.stop()
+            self._timer = None
+
+        wait = min(self.delay, self._burst_started + self.max_wait - now)
+        if wait <= 0:
+            # out of latency budget
+            self._apply()
+        else:
+            self._timer = self._owner.set_timer(wait, self._apply)
+
+    def flush(self):
+        """Apply a pending target now."""
+        if self._timer is not None:
+            self._timer.stop()
+            self._apply()
+
+    def _apply(self):
+        self._timer = None
+        self._last_applied = monotonic()
+        self.applied += 1
+        target, self._target = self._target, None
+        self._callback(target)
+
+    def stats(self) -> str:
+        return f"{self.applied} applied, {self.dropped} dropped of {self.submitted}"
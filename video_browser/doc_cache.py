@@ -0,0 +1,34 @@
+"""A local copy of view documents (e.g. latest_ten) as concatenated BSON.
+
+Documents are read back as RawBSONDocuments, so loading is a single read
+and a channel is only decoded when something looks at it. The file is
+replaced atomically on save.
+"""
+import os
+from pathlib import Path
+
+import bson
+from bson.raw_bson import DEFAULT_RAW_BSON_OPTIONS, RawBSONDocument
+
+
+def load_docs(path) -> list:
+    return bson.decode_all(Path(path).read_bytes(), DEFAULT_RAW_BSON_OPTIONS)
+
+
+def save_docs(path, docs):
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        for doc in docs:
+            f.write(doc.raw if isinstance(doc, RawBSONDocument) else bson.encode(doc))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def saved_at(path) -> float | None:
+    """When the cache was last written, None when there is none."""
+    try:
+        return Path(path).stat().st_mtime
+    except FileNotFoundError:
+        return None
@@ -0,0 +1,48 @@
+import heapq
+from itertools import islice
+
+
+class LatestFeed:
+    """Every channel's videos in one newest-first stream, merged lazily.
+
+    `heapq.merge` keeps a single pending entry per channel, so taking the
+    first n videos costs O(k + n log k) for k channels instead of sorting
+    all of them. The merge runs over (published_ts, channel, position)
+    entries read with `published_timestamps()` where DATA has it, so a
+    snapshot channel is only decoded once one of its videos is taken and a
+    ChannelLRU contributes just the channels it has loaded.
+
+    The feed is a view of DATA as it was when created; videos that
+    disappear from a channel meanwhile are skipped.
+    """
+
+    def __init__(self, data):
+        self._data = data
+        self._merged = heapq.merge(*(self._channel_entries(channel) for channel in data), reverse=True)
+        self.taken = 0
+
+    def _channel_entries(self, channel):
+        timestamps = getattr(self._data, "published_timestamps", None)
+        if timestamps is not None:
+            published = timestamps(channel) or []
+        else:
+            published = [video.published_ts for video in self._data[channel]]
+        positions = range(len(published))
+        # the lists are kept newest first; only sort one that is not
+        if any(a < b for a, b in zip(published, published[1:])):
+            positions = sorted(positions, key=published.__getitem__, reverse=True)
+        for position in positions:
+            yield published[position], channel, position
+
+    def take(self, count) -> list:
+        """The next `count` (channel, video) pairs, fewer once the feed runs out."""
+        taken = []
+        for _, channel, position in islice(self._merged, count):
+            try:
+                videos = self._data[channel]
+            except KeyError:
+                continue
+            if position < len(videos):
+                taken.append((channel, videos[position]))
+        self.taken += len(taken)
+        return taken
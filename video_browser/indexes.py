@@ -0,0 +1,195 @@
+"""Make sure the indexes the apps rely on exist and report how MongoDB plans their queries.
+
+    python -m video_browser.indexes [--no-create]
+
+Reads MONGO_URI from the environment (or .env). Each query the apps run
+often is explained with executionStats: the latest_* view pipelines, a
+keyset page of one channel, the delta-sync `_id` range and the `seen`
+update. A winning plan with a collection scan or an in-memory sort prints
+a warning, and the exit status is 1 if there were any.
+"""
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+
+from bson import ObjectId
+from dotenv import load_dotenv
+
+from video_browser.repository import CHANNEL_FIELD, get_repository
+
+# name -> keys; the channel one serves the views' per-channel sort and the keyset pages
+REQUIRED_INDEXES = {
+    "channel_published": [(CHANNEL_FIELD, 1), ("published_at", -1), ("_id", -1)],
+    "seen": [("seen", 1)],
+}
+VIEWS = ("latest_ten", "latest_20")
+# winning-plan stages worth a warning
+SLOW_STAGES = {
+    "COLLSCAN": "collection scan",
+    "SORT": "in-memory sort",
+}
+
+
+@dataclass
+class PlanReport:
+    """What explain() said about one query."""
+    name: str
+    seconds: float
+    stages: list
+    execution_ms: int | None = None
+    docs_examined: int | None = None
+    keys_examined: int | None = None
+    warnings: list = field(default_factory=list)
+
+    def __str__(self):
+        line = f"{self.name:<24} {self.seconds * 1000:8.1f} ms  {' > '.join(self.stages) or '?'}"
+        if self.execution_ms is not None:
+            line += f"  server={self.execution_ms} ms"
+        if self.docs_examined is not None:
+            line += f"  docs={self.docs_examined} keys={self.keys_examined}"
+        return line
+
+
+def ensure_indexes(collection) -> list:
+    """Create whichever REQUIRED_INDEXES are missing. Returns the names created."""
+    existing = {tuple(info["key"]) for info in collection.index_information().values()}
+    created = []
+    for name, keys in REQUIRED_INDEXES.items():
+        if tuple(keys) not in existing:
+            collection.create_index(keys, name=name)
+            created.append(name)
+    return created
+
+
+def view_pipeline(db, view):
+    """(source collection, pipeline) of a view, or None when it does not exist."""
+    for info in db.list_collections(filter={"name": view}):
+        options = info.get("options", {})
+        return options.get("viewOn"), options.get("pipeline", [])
+    return None
+
+
+def explain(db, name, command) -> PlanReport:
+    start = time.perf_counter()
+    result = db.command("explain", command, verbosity="executionStats")
+    seconds = time.perf_counter() - start
+
+    stages = list(winning_stages(result))
+    report = PlanReport(
+        name, seconds, stages,
+        execution_ms=first_value(result, "executionTimeMillis"),
+        docs_examined=first_value(result, "totalDocsExamined"),
+        keys_examined=first_value(result, "totalKeysExamined"),
+    )
+    for stage in stages:
+        if stage in SLOW_STAGES:
+            report.warnings.append(f"{name}: {SLOW_STAGES[stage]} ({stage})")
+    return report
+
+
+def winning_stages(node):
+    """Stage names of the winning plan(s) and aggregation stages ($group, ...), each once; rejected plans are skipped.
+
+    winningPlan and executionStages describe the same plan, so most names
+    turn up twice.
+    """
+    yield from dict.fromkeys(_stage_names(node))
+
+
+def _stage_names(node, pipeline_stage=False):
+    if isinstance(node, dict):
+        stage = node.get("stage")
+        if isinstance(stage, str):
+            yield stage
+        for key, value in node.items():
+            if pipeline_stage and key.startswith("$") and key != "$cursor":
+                # {"$group": spec, "nReturned": ...}; the spec's operators are not stages
+                yield key
+            elif key == "stages" and isinstance(value, list):
+                for entry in value:
+                    yield from _stage_names(entry, pipeline_stage=True)
+            elif key != "rejectedPlans":
+                yield from _stage_names(value)
+    elif isinstance(node, list):
+        for value in node:
+            yield from _stage_names(value)
+
+
+def first_value(node, key):
+    if isinstance(node, dict):
+        if key in node:
+            return node[key]
+        values = node.values()
+    elif isinstance(node, list):
+        values = node
+    else:
+        return None
+    for value in values:
+        found = first_value(value, key)
+        if found is not None:
+            return found
+    return None
+
+
+def plan_reports(db, collection_name) -> list:
+    """explain() every query the apps depend on."""
+    reports = []
+    for view in VIEWS:
+        source = view_pipeline(db, view)
+        if source is None:
+            print(f"view {view} does not exist, skipped")
+            continue
+        view_on, pipeline = source
+        reports.append(explain(db, f"view {view}", {"aggregate": view_on, "pipeline": pipeline, "cursor": {}}))
+
+    videos = db[collection_name]
+    sample = videos.find_one({}, projection={CHANNEL_FIELD: 1, "published_at": 1})
+    if sample is None:
+        print(f"{collection_name} is empty, only the views were explained")
+        return reports
+    channel = sample.get(CHANNEL_FIELD)
+    reports.append(explain(db, "channel page", {
+        "find": collection_name,
+        "filter": {CHANNEL_FIELD: channel, "$or": [
+            {"published_at": {"$lt": sample["published_at"]}},
+            {"published_at": sample["published_at"], "_id": {"$lt": sample["_id"]}},
+        ]},
+        "sort": {"published_at": -1, "_id": -1},
+        "limit": 50,
+    }))
+    reports.append(explain(db, "delta sync", {
+        "find": collection_name,
+        "filter": {"_id": {"$gt": sample["_id"]}},
+        "sort": {"_id": 1},
+    }))
+    # an _id that matches nothing, so explaining with executionStats writes nothing either way
+    reports.append(explain(db, "seen update", {
+        "update": collection_name,
+        "updates": [{"q": {"_id": ObjectId()}, "u": {"$set": {"seen": True}}}],
+    }))
+    return reports
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    load_dotenv()
+    repository = get_repository(os.getenv("MONGO_URI"))
+    try:
+        if "--no-create" not in argv:
+            created = ensure_indexes(repository.videos)
+            print(f"created indexes: {', '.join(created)}" if created else "all indexes present")
+        reports = plan_reports(repository.db, repository.collection_name)
+    finally:
+        repository.close()
+
+    warnings = [warning for report in reports for warning in report.warnings]
+    for report in reports:
+        print(report)
+    for warning in warnings:
+        print(f"WARNING: {warning}")
+    return 1 if warnings else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
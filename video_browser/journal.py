@@ -0,0 +1,238 @@
+"""Append-only journal of DATA changes on top of the columnar snapshot.
+
+Only what changed since the last flush is written: a whole channel when its
+video list was replaced or merged into (a drop marker when it was removed),
+a single flag when a video's `seen` was toggled, and a reset marker when
+DATA was reloaded from scratch. Every
+record is a BSON document preceded by its CRC32, so a record torn by a crash
+is detected and dropped on the next load; the snapshot itself is only ever
+replaced atomically. Compaction folds the journal into a new snapshot and
+keeps whatever was appended while it ran.
+"""
+import os
+import shutil
+import struct
+import threading
+import zlib
+from pathlib import Path
+
+import bson
+
+from video_browser.models import VIDEO_FIELDS, Video
+from video_browser.snapshot import load_snapshot, write_snapshot
+
+
+CRC = struct.Struct("<I")
+BSON_LENGTH = struct.Struct("<i")
+# compact once the journal outgrows this fraction of the snapshot...
+COMPACT_RATIO = 0.25
+# ...but never bother below this many bytes
+COMPACT_MIN_BYTES = 1 << 20
+
+
+class CachePersistence:
+    """Dirty tracking plus journal/snapshot persistence for DATA."""
+
+    def __init__(self, snapshot_path, journal_path=None):
+        self.snapshot_path = Path(snapshot_path)
+        self.journal_path = Path(journal_path or f"{snapshot_path}.journal")
+        self._lock = threading.Lock()
+        # records encoded on the UI thread and not yet written; never held across I/O
+        self._pending_lock = threading.Lock()
+        self._pending = bytearray()
+        # held for a whole compaction; both writers go through the same snapshot .tmp file
+        self._compact_lock = threading.Lock()
+        self._reset = False
+        self._channels = set()
+        self._seen = {}  # (channel, video_id) -> Video
+
+    def exists(self) -> bool:
+        return self.snapshot_path.exists() or self.journal_path.exists()
+
+    def saved_at(self) -> float | None:
+        """When the snapshot or journal was last written, None when neither exists."""
+        times = [path.stat().st_mtime for path in (self.snapshot_path, self.journal_path) if path.exists()]
+        return max(times, default=None)
+
+    def load(self):
+        """The snapshot (or an empty dict) with every intact journal record replayed over it.
+
+        A snapshot this version cannot read is dropped with its journal; the
+        caller then finds nothing cached and loads from MongoDB.
+        """
+        try:
+            data = load_snapshot(self.snapshot_path) if self.snapshot_path.exists() else {}
+        except ValueError:
+            self.snapshot_path.unlink()
+            self.journal_path.unlink(missing_ok=True)
+            return {}
+        if not self.journal_path.exists():
+            return data
+
+        with open(self.journal_path, "r+b") as f:
+            good_end = 0
+            for record, end in _read_records(f):
+                _apply(data, record)
+                good_end = end
+            # drop a torn tail so new records follow the last good one
+            f.truncate(good_end)
+        return data
+
+    # --- dirty tracking ---
+
+    def mark_reset(self):
+        """DATA was replaced wholesale; everything before this is obsolete."""
+        self._reset = True
+        self._channels.clear()
+        self._seen.clear()
+
+    def mark_channel(self, channel):
+        self._channels.add(channel)
+
+    def mark_seen(self, channel, video):
+        self._seen[(channel, video.video_id)] = video
+
+    @property
+    def dirty(self) -> bool:
+        return self._reset or bool(self._channels) or bool(self._seen)
+
+    # --- writing ---
+
+    def flush(self, data) -> int:
+        """Append records for everything marked since the last flush. Returns bytes written."""
+        self.take(data)
+        return self.write_pending()
+
+    def take(self, data) -> int:
+        """Encode everything marked since the last take into memory. Returns bytes encoded.
+
+        Cheap enough for the UI thread; write_pending() does the disk I/O.
+        """
+        if not self.dirty:
+            return 0
+
+        records = []
+        if self._reset:
+            records.append({"op": "reset"})
+        for channel in self._channels:
+            if channel in data:
+                records.append({"op": "channel", "channel": channel, "videos": [_video_doc(v) for v in data[channel]]})
+            else:
+                records.append({"op": "drop", "channel": channel})
+        for (channel, video_id), video in self._seen.items():
+            if channel not in self._channels:
+                records.append({"op": "seen", "channel": channel, "video_id": video_id, "seen": video.seen})
+
+        payload = bytearray()
+        for record in records:
+            encoded = bson.encode(record)
+            payload += CRC.pack(zlib.crc32(encoded))
+            payload += encoded
+        with self._pending_lock:
+            self._pending += payload
+
+        self._reset = False
+        self._channels.clear()
+        self._seen.clear()
+        return len(payload)
+
+    def write_pending(self) -> int:
+        """Append what take() encoded to the journal and fsync it. Returns bytes written.
+
+        Safe from a worker thread. On failure the records stay pending, in
+        order, for the next call.
+        """
+        with self._lock:
+            with self._pending_lock:
+                payload, self._pending = self._pending, bytearray()
+            if not payload:
+                return 0
+            try:
+                with open(self.journal_path, "ab") as f:
+                    f.write(payload)
+                    f.flush()
+                    os.fsync(f.fileno())
+            except OSError:
+                with self._pending_lock:
+                    self._pending[:0] = payload
+                raise
+        return len(payload)
+
+    def needs_compaction(self) -> bool:
+        if not self.snapshot_path.exists():
+            return self.journal_path.exists()
+        try:
+            journal_size = self.journal_path.stat().st_size
+        except FileNotFoundError:
+            return False
+        return journal_size >= max(COMPACT_MIN_BYTES, COMPACT_RATIO * self.snapshot_path.stat().st_size)
+
+    @property
+    def compacting(self) -> bool:
+        return self._compact_lock.locked()
+
+    def compact(self, data):
+        """Write `data` as the new snapshot and trim the journal records it now contains.
+
+        Call flush() first. From a worker thread, pass what snapshot_items()
+        took of DATA on the UI thread rather than DATA itself: records
+        appended while the snapshot is written are kept, and replaying them
+        over the new snapshot gives the same state. A second compaction
+        waits for one still running.
+        """
+        with self._compact_lock:
+            self._compact(data)
+
+    def _compact(self, data):
+        with self._lock:
+            folded = self.journal_path.stat().st_size if self.journal_path.exists() else 0
+
+        write_snapshot(self.snapshot_path, data)
+
+        with self._lock:
+            if not self.journal_path.exists():
+                return
+            tmp_path = self.journal_path.with_name(self.journal_path.name + ".tmp")
+            with open(self.journal_path, "rb") as src, open(tmp_path, "wb") as dst:
+                src.seek(folded)
+                shutil.copyfileobj(src, dst)
+                dst.flush()
+                os.fsync(dst.fileno())
+            os.replace(tmp_path, self.journal_path)
+
+
+def _video_doc(video):
+    return {name: getattr(video, name) for name in VIDEO_FIELDS}
+
+
+def _read_records(f):
+    """Yield (record, end offset) for each intact record, stopping at the first damaged one."""
+    position = 0
+    while True:
+        header = f.read(CRC.size + BSON_LENGTH.size)
+        if len(header) < CRC.size + BSON_LENGTH.size:
+            return
+        (crc,) = CRC.unpack_from(header)
+        (length,) = BSON_LENGTH.unpack_from(header, CRC.size)
+        if length < BSON_LENGTH.size + 1:
+            return
+        encoded = header[CRC.size:] + f.read(length - BSON_LENGTH.size)
+        if len(encoded) != length or zlib.crc32(encoded) != crc:
+            return
+        position += CRC.size + length
+        yield bson.decode(encoded), position
+
+
+def _apply(data, record):
+    op = record["op"]
+    if op == "reset":
+        data.clear()
+    elif op == "channel":
+        data[record["channel"]] = [Video(**doc) for doc in record["videos"]]
+    elif op == "drop":
+        data.pop(record["channel"], None)
+    elif op == "seen":
+        for video in data.get(record["channel"], ()):
+            if video.video_id == record["video_id"]:
+                video.seen = record["seen"]
+                break
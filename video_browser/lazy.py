@@ -0,0 +1,95 @@
+import sys
+from collections import OrderedDict
+from collections.abc import MutableMapping
+
+
+class NotLoaded(KeyError):
+    """The channel exists but its videos have not been fetched (or were evicted)."""
+
+
+def approx_size(videos) -> int:
+    """Rough bytes held by a list of Video objects or video documents."""
+    size = sys.getsizeof(videos)
+    for video in videos:
+        values = video.values() if isinstance(video, dict) else (getattr(video, name) for name in video.__slots__)
+        size += sys.getsizeof(video) + sum(sys.getsizeof(value) for value in values)
+    return size
+
+
+class ChannelLRU(MutableMapping):
+    """DATA for lazy mode: every channel name is known, only recently used ones keep videos.
+
+    Looking up a channel that is not loaded raises NotLoaded (a KeyError);
+    `in` still answers whether the channel exists. Storing videos evicts the
+    least recently used channels once the total passes `max_bytes`.
+    `on_unload(channel)` is called whenever a channel's videos are let go,
+    evicted, unloaded or deleted, so caches kept next to them can follow.
+    """
+
+    def __init__(self, channels, max_bytes, on_unload=None):
+        self.max_bytes = max_bytes
+        self.on_unload = on_unload
+        self.bytes = 0
+        self.evictions = 0
+        self._channels = dict.fromkeys(channels)
+        self._loaded = OrderedDict()
+        self._sizes = {}
+
+    def is_loaded(self, channel) -> bool:
+        return channel in self._loaded
+
+    def __contains__(self, channel):
+        return channel in self._channels
+
+    def __getitem__(self, channel):
+        try:
+            videos = self._loaded[channel]
+        except KeyError:
+            if channel in self._channels:
+                raise NotLoaded(channel) from None
+            raise
+        self._loaded.move_to_end(channel)
+        return videos
+
+    def __setitem__(self, channel, videos):
+        self._channels[channel] = None
+        self.unload(channel)
+        self._loaded[channel] = videos
+        self._sizes[channel] = approx_size(videos)
+        self.bytes += self._sizes[channel]
+        # always keep the channel just stored, even if it alone is over the limit
+        while self.bytes > self.max_bytes and len(self._loaded) > 1:
+            evicted, _ = self._loaded.popitem(last=False)
+            self.bytes -= self._sizes.pop(evicted)
+            self.evictions += 1
+            if self.on_unload is not None:
+                self.on_unload(evicted)
+
+    def __delitem__(self, channel):
+        del self._channels[channel]
+        self.unload(channel)
+
+    def __iter__(self):
+        return iter(self._channels)
+
+    def __len__(self):
+        return len(self._channels)
+
+    def add_channel(self, channel):
+        """Make a channel known without loading its videos."""
+        self._channels.setdefault(channel, None)
+
+    def unload(self, channel):
+        if self._loaded.pop(channel, None) is not None:
+            self.bytes -= self._sizes.pop(channel)
+            if self.on_unload is not None:
+                self.on_unload(channel)
+
+    def published_timestamps(self, channel):
+        """published_ts of a loaded channel's videos, None when it is not loaded."""
+        if channel not in self._loaded:
+            return None
+        return [video.published_ts for video in self._loaded[channel]]
+
+    def stats(self) -> str:
+        return f"{len(self._loaded)}/{len(self._channels)} channels loaded, {self.bytes / 1024:.0f} KiB, {self.evictions} evicted"
@@ -0,0 +1,88 @@
+import asyncio
+from datetime import datetime, timezone
+
+from bson import ObjectId
+
+
+class LiveUpdates:
+    """Feeds videos inserted into MongoDB to `apply(docs)` while an app runs.
+
+    Uses a change stream on the videos collection when the server has one
+    (replica sets and Atlas). On a standalone mongod, or once the stream
+    fails, it polls instead for `_id` greater than the newest one seen, which
+    the default `_id` index answers without a scan; polled documents at or
+    below that watermark are dropped.
+
+    Stream events are not held to the watermark: they come in commit order,
+    and an insert can commit after one with a higher `_id` (ids made by
+    clients, clocks of writers apart). Only the documents the catch-up poll
+    run right after the stream opens already delivered are dropped from
+    them; `apply` still has to skip videos it holds by `_id`.
+
+    Only the repository is touched (`watch_inserts`, `next_inserts`,
+    `close_stream`, `fetch_videos`), so a fake repository drives it in tests.
+    """
+
+    def __init__(self, repository, apply, since_id=None, projection=None, poll_interval=10.0):
+        self._repository = repository
+        self._apply = apply
+        # ObjectIds start with their creation time, so "now" skips everything already loaded
+        self.since_id = since_id or ObjectId.from_datetime(datetime.now(timezone.utc))
+        self.projection = projection
+        self.poll_interval = poll_interval
+        self.mode = None  # "change stream" or "poll" once running
+        self._caught_up = set()  # _ids the catch-up poll delivered, dropped from the stream
+        self.delivered = 0
+        self.error = None
+
+    async def run(self):
+        """Deliver inserts until cancelled (e.g. with the worker running this)."""
+        try:
+            stream = await self._repository.watch_inserts(self.projection)
+        except Exception as e:
+            self.error = e
+        else:
+            self.mode = "change stream"
+            try:
+                self._caught_up = {doc["_id"] for doc in await self.poll_once()}
+                while True:
+                    self._deliver_events(await self._repository.next_inserts(stream))
+            except Exception as e:
+                self.error = e
+            finally:
+                self._caught_up = set()
+                await self._repository.close_stream(stream)
+
+        self.mode = "poll"
+        while True:
+            try:
+                await self.poll_once()
+            except Exception as e:
+                self.error = e
+            await asyncio.sleep(self.poll_interval)
+
+    async def poll_once(self) -> list:
+        """Deliver what was inserted above the watermark; returns those documents."""
+        docs = await self._repository.fetch_videos(
+            {"_id": {"$gt": self.since_id}}, sort=[("_id", 1)], projection=self.projection,
+        )
+        docs = [doc for doc in docs if doc["_id"] > self.since_id]
+        self._deliver(docs)
+        return docs
+
+    def _deliver_events(self, docs):
+        if self._caught_up:
+            docs = [doc for doc in docs if doc["_id"] not in self._caught_up]
+        self._deliver(docs)
+
+    def _deliver(self, docs):
+        if not docs:
+            return
+        # a poll after the stream fails starts from here
+        self.since_id = max(self.since_id, *(doc["_id"] for doc in docs))
+        self.delivered += len(docs)
+        self._apply(docs)
+
+    def stats(self) -> str:
+        error = f", last error: {self.error}" if self.error is not None else ""
+        return f"{self.mode or 'not started'}, {self.delivered} delivered since {self.since_id}{error}"
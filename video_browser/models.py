@@ -0,0 +1,95 @@
+import sys
+from datetime import datetime, timedelta, timezone
+
+from bson import ObjectId
+
+
+EPOCH = datetime(1970, 1, 1)
+VIDEO_FIELDS = frozenset(("_id", "title", "video_id", "published_at", "url", "duration", "seen"))
+
+
+def to_micros(dt: datetime) -> int:
+    """Microseconds since the epoch for a naive-UTC (as pymongo returns it) or aware datetime."""
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return (dt - EPOCH) // timedelta(microseconds=1)
+
+
+def from_micros(value: int) -> datetime:
+    return EPOCH + timedelta(microseconds=value)
+
+
+class Video:
+    """One video of a channel.
+
+    Slotted and kept small because a cache can hold hundreds of thousands of
+    them: `_id` is stored as its 12 raw bytes, `published_at` as integer
+    microseconds since the epoch (`published_ts`), and the short strings that
+    repeat across videos (durations, the "N/A" defaults) are interned. The
+    `_id` and `published_at` attributes still read and write ObjectId and
+    datetime values.
+    """
+
+    __slots__ = ("_oid", "title", "video_id", "published_ts", "url", "duration", "seen")
+
+    def __init__(self, _id, title, video_id, published_at, url="N/A", duration="N/A", seen=False):
+        self._id = _id
+        self.title = title
+        self.video_id = video_id
+        self.published_at = published_at
+        self.url = sys.intern(url) if url == "N/A" else url
+        self.duration = sys.intern(duration) if isinstance(duration, str) else duration
+        self.seen = seen
+
+    @property
+    def _id(self) -> ObjectId:
+        return ObjectId(self._oid)
+
+    @_id.setter
+    def _id(self, value):
+        self._oid = value.binary if isinstance(value, ObjectId) else ObjectId(value).binary
+
+    @property
+    def published_at(self) -> datetime:
+        return from_micros(self.published_ts)
+
+    @published_at.setter
+    def published_at(self, value):
+        # ints are taken as microseconds already, e.g. straight from the snapshot column
+        self.published_ts = value if isinstance(value, int) else to_micros(value)
+
+    def __eq__(self, other):
+        if not isinstance(other, Video):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return (
+            f"Video(_id={self._id!r}, title={self.title!r}, video_id={self.video_id!r}, "
+            f"published_at={self.published_at!r}, url={self.url!r}, duration={self.duration!r}, "
+            f"seen={self.seen!r})"
+        )
+
+    def __getstate__(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __setstate__(self, state):
+        # slotted state, or the __dict__ of a Video pickled when it was still a dataclass
+        if isinstance(state, tuple):
+            state = state[1]
+        if "_oid" in state:
+            for name, value in state.items():
+                setattr(self, name, value)
+        else:
+            self.__init__(**{name: value for name, value in state.items() if name in VIDEO_FIELDS})
+
+
+def video_projection(prefix=""):
+    """A find() projection that keeps only the Video fields, e.g. prefix="latest_videos." for the views."""
+    return {f"{prefix}{name}": 1 for name in sorted(VIDEO_FIELDS)}
+
+
+def video_from_doc(doc):
+    return Video(**{k:v for k,v in doc.items() if k in VIDEO_FIELDS})
@@ -0,0 +1,79 @@
+from collections import deque
+
+from video_browser.models import video_from_doc
+
+
+def page_key(video) -> tuple:
+    """The (published_at, _id) keyset position of a video."""
+    return (video.published_at, video._id)
+
+
+class KeysetPager:
+    """One channel's videos, newest first, fetched a page at a time.
+
+    Pages continue from the (published_at, _id) of the row next to them, so
+    fetching deep into a back catalogue costs the same as the first page. Only
+    `max_pages` consecutive pages are held: loading past either end drops the
+    page at the opposite end, which `load_newer()`/`load_older()` refetch if
+    the user scrolls back.
+    """
+
+    def __init__(self, repository, channel, page_size=50, max_pages=4):
+        self.repository = repository
+        self.channel = channel
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.pages = deque()
+        self.at_start = True  # nothing newer than the first page held
+        self.at_end = False  # nothing older than the last page held
+        self.loading = False
+        self.evictions = 0
+
+    @property
+    def videos(self) -> list:
+        return [video for page in self.pages for video in page]
+
+    async def load_older(self) -> bool:
+        """Fetch the page after the last one held. False when there was nothing to fetch."""
+        if self.at_end or self.loading:
+            return False
+        older_than = page_key(self.pages[-1][-1]) if self.pages else None
+        page = await self._fetch(older_than=older_than)
+        if len(page) < self.page_size:
+            self.at_end = True
+        if not page:
+            return False
+        self.pages.append(page)
+        if len(self.pages) > self.max_pages:
+            self.pages.popleft()
+            self.at_start = False
+            self.evictions += 1
+        return True
+
+    async def load_newer(self) -> bool:
+        """Fetch the page before the first one held. False when there was nothing to fetch."""
+        if self.at_start or self.loading or not self.pages:
+            return False
+        page = await self._fetch(newer_than=page_key(self.pages[0][0]))
+        if len(page) < self.page_size:
+            self.at_start = True
+        if not page:
+            return False
+        self.pages.appendleft(page)
+        if len(self.pages) > self.max_pages:
+            self.pages.pop()
+            self.at_end = False
+            self.evictions += 1
+        return True
+
+    async def _fetch(self, **keyset) -> list:
+        self.loading = True
+        try:
+            docs = await self.repository.fetch_channel_page(self.channel, limit=self.page_size, **keyset)
+        finally:
+            self.loading = False
+        return [video_from_doc(doc) for doc in docs]
+
+    def stats(self) -> str:
+        return (f"{self.channel}: {len(self.pages)} page(s) of {self.page_size} held, "
+                f"{self.evictions} evicted, at_start={self.at_start}, at_end={self.at_end}")
@@ -0,0 +1,54 @@
+import asyncio
+from functools import partial
+from time import monotonic
+
+
+class NeighbourPrefetcher:
+    """Warms caches for the entries around the highlighted one while the app is idle.
+
+    After each highlight settles, `schedule()` waits `idle_delay` seconds and
+    then calls `warm(target)` for the next and previous `radius` entries,
+    nearest first (next before previous, since browsing mostly goes down).
+    Before each step it checks how late a short sleep wakes up; if the event
+    loop is busy by more than `busy_lag` it backs off, doubling the pause up
+    to `max_backoff`. A new `schedule()` cancels the previous run.
+    """
+
+    def __init__(self, app, warm, radius=3, idle_delay=0.15, busy_lag=0.01, max_backoff=1.0):
+        self._app = app
+        self._warm = warm
+        self.radius = radius
+        self.idle_delay = idle_delay
+        self.busy_lag = busy_lag
+        self.max_backoff = max_backoff
+        self.warmed = 0
+        self.backoffs = 0
+
+    def schedule(self, targets, index):
+        """Prefetch around `targets[index]`; `targets` is the list being browsed."""
+        if index is None or self.radius <= 0:
+            return
+        order = []
+        for distance in range(1, self.radius + 1):
+            for i in (index + distance, index - distance):
+                if 0 <= i < len(targets):
+                    order.append(targets[i])
+        # a coroutine function rather than a coroutine, so a run cancelled before it starts leaves nothing un-awaited
+        self._app.run_worker(partial(self._run, order), group="prefetch", exclusive=True, exit_on_error=False)
+
+    async def _run(self, targets):
+        await asyncio.sleep(self.idle_delay)
+        backoff = self.idle_delay
+        for target in targets:
+            while await self._loop_lag() > self.busy_lag:
+                self.backoffs += 1
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+            self._warm(target)
+            self.warmed += 1
+
+    @staticmethod
+    async def _loop_lag(probe=0.001):
+        start = monotonic()
+        await asyncio.sleep(probe)
+        return monotonic() - start - probe
@@ -0,0 +1,88 @@
+from bisect import bisect_left, insort
+from datetime import date, datetime, time, timedelta
+
+from video_browser.models import from_micros, to_micros
+
+
+class NewVideoIndex:
+    """Per-channel sorted publish times, so "how many new videos" is one bisect.
+
+    A video is new when it was published on or after the start of the day
+    `window_days` ago. The cutoffs are computed once per day, by
+    `refresh_cutoff()` and then `advance_day()` (e.g. from a DayClock),
+    instead of once per video.
+    """
+
+    def __init__(self, window_days=2, today: date | None = None):
+        self.window_days = window_days
+        self._published = {}  # channel -> ascending published_ts
+        self._counts = {}  # channel -> count reported by the server, for channels not indexed here
+        self.refresh_cutoff(today)
+
+    def refresh_cutoff(self, today: date | None = None):
+        today = today or date.today()
+        self.cutoff_date = today - timedelta(days=self.window_days)
+        self.cutoff = to_micros(datetime.combine(self.cutoff_date, time.min))
+        # start of today, for telling today's videos from the rest of the window
+        self.today_cutoff = to_micros(datetime.combine(today, time.min))
+
+    @property
+    def cutoff_datetime(self) -> datetime:
+        return from_micros(self.cutoff)
+
+    def build(self, data):
+        """Index every channel of DATA (a dict, SnapshotData or ChannelLRU).
+
+        Channels with a server count keep it: it covers all their videos,
+        where a ChannelLRU only holds each loaded channel's latest ones.
+        """
+        self._published = {}
+        timestamps = getattr(data, "published_timestamps", None)
+        for channel in data:
+            if channel in self._counts:
+                continue
+            if timestamps is not None:
+                # undecoded snapshot channels are read off the column
+                published = timestamps(channel)
+                if published is not None:
+                    self._published[channel] = sorted(published)
+            else:
+                self.set_channel(channel, data[channel])
+
+    def advance_day(self, today: date) -> set:
+        """Move the cutoffs to `today`. Returns the indexed channels whose count changed.
+
+        Only channels with a video between the old and the new cutoff can
+        change, and one bisect per channel finds them.
+        """
+        old_cutoff = self.cutoff
+        self.refresh_cutoff(today)
+        return {
+            channel for channel, published in self._published.items()
+            if bisect_left(published, old_cutoff) != bisect_left(published, self.cutoff)
+        }
+
+    def set_count(self, channel, count):
+        """Use a count computed elsewhere (e.g. server side) until the channel's videos are indexed."""
+        self._counts[channel] = count
+
+    def set_channel(self, channel, videos):
+        self._published[channel] = sorted(video.published_ts for video in videos)
+
+    def add_video(self, channel, video):
+        if channel not in self._published and channel in self._counts:
+            # only a server count to go on, keep it in step
+            if video.published_ts >= self.cutoff:
+                self._counts[channel] += 1
+            return
+        insort(self._published.setdefault(channel, []), video.published_ts)
+
+    def remove_channel(self, channel):
+        self._published.pop(channel, None)
+        self._counts.pop(channel, None)
+
+    def count(self, channel) -> int:
+        published = self._published.get(channel)
+        if published is None:
+            return self._counts.get(channel, 0)
+        return len(published) - bisect_left(published, self.cutoff)
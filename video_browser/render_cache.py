@@ -0,0 +1,70 @@
+import sys
+from collections import OrderedDict
+
+
+def sizeof_cells(cells) -> int:
+    """Bytes of a tuple of table cells and what they hold; a non-string cell (a rich Text) counts its object and its text."""
+    size = sys.getsizeof(cells)
+    for cell in cells:
+        size += sys.getsizeof(cell)
+        if not isinstance(cell, str):
+            size += sys.getsizeof(str(cell))
+    return size
+
+
+class RenderCache:
+    """A size-capped LRU of rendered documents (strings), with hit/miss counters.
+
+    Keys should include a content version so stale renders are never served;
+    `clear()` drops everything at once, e.g. on refresh. Values are measured
+    with `sizeof`, which has to count what a container holds for anything
+    that is not a flat string.
+    """
+
+    def __init__(self, max_bytes=8 * 2**20, sizeof=sys.getsizeof):
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, render):
+        """The cached value for `key`, calling `render()` to produce it on a miss."""
+        try:
+            value = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            value = render()
+            self.put(key, value)
+            return value
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        if key in self._entries:
+            self.bytes -= self.sizeof(self._entries.pop(key))
+        size = self.sizeof(value)
+        if size > self.max_bytes:
+            return
+        self._entries[key] = value
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.bytes -= self.sizeof(evicted)
+
+    def clear(self):
+        self._entries.clear()
+        self.bytes = 0
+
+    def stats(self) -> str:
+        total = self.hits + self.misses
+        rate = self.hits / total * 100 if total else 0.0
+        return f"{len(self._entries)} entries, {self.bytes / 1024:.0f} KiB, {self.hits} hits / {self.misses} misses ({rate:.0f}%)"
@@ -0,0 +1,227 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+
+from bson import ObjectId
+from bson.raw_bson import DEFAULT_RAW_BSON_OPTIONS
+from pymongo import MongoClient, UpdateOne
+from pymongo.server_api import ServerApi
+
+from video_browser.models import video_projection
+
+
+MONGO_DATABASE_NAME = "youtube_data"
+MONGO_COLLECTION_NAME = "videos"
+# the latest_* views group the videos collection on this field
+CHANNEL_FIELD = "channel_title"
+# threads available for blocking pymongo calls; also the client's connection pool size
+MAX_WORKERS = 4
+
+
+@dataclass(frozen=True)
+class CollectionFingerprint:
+    """Document count and newest `_id` of the videos collection, to tell whether a reload is needed.
+
+    Inserts raise `max_id` (ObjectIds start with their creation time);
+    deletes lower `count`. Updates such as seen toggles change neither.
+    """
+    count: int
+    max_id: ObjectId | None
+
+    def only_grew_since(self, other) -> bool:
+        """True when the difference from `other` can be explained by inserts alone."""
+        if self.count < other.count:
+            return False
+        return other.max_id is None or (self.max_id is not None and self.max_id >= other.max_id)
+
+
+class VideoRepository:
+    """One pooled MongoClient for the lifetime of an app, with awaitable queries.
+
+    pymongo is blocking, so every call runs on a bounded thread pool and the
+    event loop only awaits the result. The client is created on first use and
+    shared by everything that holds the repository.
+    """
+
+    def __init__(self, uri, database=MONGO_DATABASE_NAME, collection=MONGO_COLLECTION_NAME,
+                 max_workers=MAX_WORKERS, client=None):
+        self.uri = uri
+        self.database_name = database
+        self.collection_name = collection
+        self.max_workers = max_workers
+        self._client = client
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="mongo")
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = MongoClient(
+                self.uri,
+                serverSelectionTimeoutMS=5000,
+                maxPoolSize=self.max_workers,
+                server_api=ServerApi('1'),
+            )
+        return self._client
+
+    @property
+    def db(self):
+        return self.client[self.database_name]
+
+    @property
+    def videos(self):
+        return self.db[self.collection_name]
+
+    async def run(self, fn, *args, **kwargs):
+        """Run a blocking call on the repository's thread pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(fn, *args, **kwargs))
+
+    async def iter_view_batches(self, view, batch_size=50, projection=None, raw=False):
+        """Yield the documents of a view (e.g. latest_20) one cursor batch at a time.
+
+        With `raw` the documents are RawBSONDocuments, decoded field by field
+        on first access, so channels whose videos are never looked at are never
+        decoded.
+        """
+        collection = self.db[view]
+        if raw:
+            collection = collection.with_options(codec_options=DEFAULT_RAW_BSON_OPTIONS)
+        cursor = collection.find(projection=projection, batch_size=batch_size)
+        try:
+            while True:
+                batch = await self.run(_next_batch, cursor, batch_size)
+                if not batch:
+                    return
+                yield batch
+        finally:
+            await self.run(cursor.close)
+
+    async def fetch_channels(self, view="latest_20"):
+        """All channel documents ({_id: channel, latest_videos: [...]}) of a view."""
+        return await self.run(lambda: list(self.db[view].find()))
+
+    async def fetch_videos(self, filter=None, sort=None, limit=0, projection=None):
+        """Video documents from the videos collection."""
+        return await self.run(
+            lambda: list(self.videos.find(filter or {}, projection=projection, sort=sort, limit=limit))
+        )
+
+    async def fetch_channel_summaries(self, new_since=None):
+        """One small document per channel: {_id: channel, latest[, new_videos]}, computed server side.
+
+        new_videos counts videos published at or after `new_since` and is only
+        computed when it is given.
+        """
+        group = {"_id": f"${CHANNEL_FIELD}", "latest": {"$max": "$published_at"}}
+        if new_since is not None:
+            group["new_videos"] = {"$sum": {"$cond": [{"$gte": ["$published_at", new_since]}, 1, 0]}}
+        pipeline = [{"$group": group}, {"$sort": {"_id": 1}}]
+        return await self.run(lambda: list(self.videos.aggregate(pipeline, allowDiskUse=True)))
+
+    async def fetch_channel_videos(self, channel, limit=0):
+        """A channel's videos, newest first."""
+        return await self.fetch_videos(
+            {CHANNEL_FIELD: channel}, sort=[("published_at", -1)], limit=limit, projection=video_projection(),
+        )
+
+    async def fetch_channel_page(self, channel, older_than=None, newer_than=None, limit=50):
+        """One page of a channel's videos, newest first, keyset-paginated on (published_at, _id).
+
+        `older_than`/`newer_than` is the (published_at, _id) of the row the page
+        continues from; with neither it is the newest page.
+        """
+        filter = {CHANNEL_FIELD: channel}
+        order = -1
+        if older_than is not None:
+            filter["$or"] = _keyset_filter("$lt", *older_than)
+        elif newer_than is not None:
+            filter["$or"] = _keyset_filter("$gt", *newer_than)
+            order = 1
+        docs = await self.fetch_videos(
+            filter, sort=[("published_at", order), ("_id", order)], limit=limit, projection=video_projection(),
+        )
+        if order == 1:
+            docs.reverse()
+        return docs
+
+    async def watch_inserts(self, projection=None, max_await_ms=1000):
+        """Open a change stream of videos inserted from now on; read it with next_inserts().
+
+        Raises (OperationFailure) on a standalone server, which has no change streams.
+        """
+        pipeline = [{"$match": {"operationType": "insert"}}]
+        if projection:
+            pipeline.append({"$project": {f"fullDocument.{name}": keep for name, keep in projection.items()}})
+        return await self.run(self.videos.watch, pipeline, max_await_time_ms=max_await_ms)
+
+    async def next_inserts(self, stream):
+        """The documents inserted since the last call; waits up to max_await_ms when there are none."""
+        return await self.run(_drain_inserts, stream)
+
+    async def close_stream(self, stream):
+        await self.run(stream.close)
+
+    async def fetch_fingerprint(self):
+        """A CollectionFingerprint of the videos collection: collection metadata plus one `_id` index lookup."""
+        def fingerprint():
+            newest = self.videos.find_one(sort=[("_id", -1)], projection={"_id": 1})
+            return CollectionFingerprint(
+                self.videos.estimated_document_count(), newest["_id"] if newest else None,
+            )
+        return await self.run(fingerprint)
+
+    async def set_seen(self, _id, seen):
+        await self.run(self.videos.update_one, {"_id": _id}, {"$set": {"seen": seen}})
+
+    async def bulk_write(self, requests):
+        return await self.run(self.videos.bulk_write, requests, ordered=False)
+
+    async def set_seen_many(self, seen_by_id):
+        """Write several seen flags in one round trip."""
+        requests = [UpdateOne({"_id": _id}, {"$set": {"seen": seen}}) for _id, seen in seen_by_id.items()]
+        return await self.bulk_write(requests)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+
+def _keyset_filter(op, published_at, _id):
+    """$or clauses for rows strictly before/after (published_at, _id) in that sort order."""
+    return [
+        {"published_at": {op: published_at}},
+        {"published_at": published_at, "_id": {op: _id}},
+    ]
+
+
+def _drain_inserts(stream):
+    docs = []
+    change = stream.try_next()
+    while change is not None:
+        docs.append(change["fullDocument"])
+        change = stream.try_next()
+    return docs
+
+
+def _next_batch(cursor, size):
+    batch = []
+    for doc in cursor:
+        batch.append(doc)
+        if len(batch) >= size:
+            break
+    return batch
+
+
+_shared_repository = None
+
+
+def get_repository(uri=None):
+    """The process-wide repository, created from MONGO_URI on first call."""
+    global _shared_repository
+    if _shared_repository is None:
+        _shared_repository = VideoRepository(uri or os.getenv("MONGO_URI"))
+    return _shared_repository
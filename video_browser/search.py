@@ -0,0 +1,295 @@
+"""Incremental title search over DATA.
+
+TitleIndex is an inverted index from lowercased title words to the videos
+containing them, each word's postings kept oldest to newest. Every word of
+a query matches as a prefix, so results narrow with each keystroke.
+
+A query walks only the postings of its word with the fewest of them (a
+bisect range of the sorted vocabulary), merged newest first, and checks
+each candidate for the other words until `limit` matches are found: in a
+set of their docs, kept while the query is typed on, or in the title when
+such a set would be too big to build. The matches are ranked with titles
+that have every query word as a whole word first, newest first within
+either group.
+
+Videos are kept as (channel, video_id, title, published_ts), never as Video
+objects, so indexing a SnapshotData reads only its title column and a
+ChannelLRU can still evict channels. A channel is re-indexed by diffing its
+video_ids, so a sync that adds one video adds one entry; entries of
+removed videos are only marked dead, and dropped from the postings once
+they make up half of them. Channels that change while the index is being
+built are re-indexed as soon as it is done.
+"""
+import heapq
+import re
+from array import array
+from bisect import bisect_left, insort
+from itertools import batched
+from typing import NamedTuple
+
+WORD = re.compile(r"\w+")
+# a prefix that ends just past every word starting with it
+PREFIX_END = "\U0010ffff"
+# a query word matching at most this many titles is checked with a set of them
+SET_CHECK_MAX = 100_000
+
+
+def words(text) -> list:
+    return WORD.findall(text.casefold())
+
+
+def unique(docs):
+    looked_at = set()
+    for doc in docs:
+        if doc not in looked_at:
+            looked_at.add(doc)
+            yield doc
+
+
+class Match(NamedTuple):
+    channel: str
+    video_id: str
+    # every query word is a whole word of the title, not just a prefix of one
+    whole: bool
+
+
+def channel_titles(data, channel):
+    """(video_ids, titles, published_ts) of a channel without decoding a snapshot channel; None when not loaded."""
+    strings = getattr(data, "strings", None)
+    if strings is not None:
+        return strings(channel, "video_id"), strings(channel, "title"), data.published_timestamps(channel)
+    try:
+        videos = data[channel]
+    except KeyError:
+        # NotLoaded, a ChannelLRU channel without videos
+        return None
+    return (
+        [video.video_id for video in videos],
+        [video.title for video in videos],
+        [video.published_ts for video in videos],
+    )
+
+
+def resolve(data, matches) -> list:
+    """(channel, Video) of each match still in `data`, in order."""
+    by_id = {}
+    found = []
+    for match in matches:
+        if match.channel not in by_id:
+            try:
+                by_id[match.channel] = {video.video_id: video for video in data[match.channel]}
+            except KeyError:
+                by_id[match.channel] = {}
+        video = by_id[match.channel].get(match.video_id)
+        if video is not None:
+            found.append((match.channel, video))
+    return found
+
+
+class TitleIndex:
+    """Inverted index of every title in DATA, see the module docstring."""
+
+    def __init__(self):
+        self._generation = 0
+        self.clear()
+
+    def clear(self):
+        """Forget everything; `ready` stays False until the next build, and a build running now stops."""
+        self._generation += 1
+        self.ready = False
+        self._queued = None  # channel -> data it changed in (None: removed), while a build runs
+        self._channels = []  # doc -> channel
+        self._video_ids = []  # doc -> video_id
+        self._titles = []  # doc -> title
+        self._published = array("q")  # doc -> published_ts
+        self._alive = bytearray()  # doc -> 0 once its video left DATA
+        self._dead = 0
+        self._channel_docs = {}  # channel -> its live docs
+        self._postings = {}  # word -> docs, ascending published_ts
+        self._vocabulary = []  # sorted words
+        self._word_sets = {}  # query word -> its docs, for the last query
+
+    def build_steps(self, data, step=500):
+        """Index every channel of DATA, yielding after each `step` channels so a UI can keep drawing.
+
+        Docs are numbered oldest first, so appending them keeps every
+        postings list in order without sorting. Channels changed meanwhile
+        are queued and re-indexed at the end; a clear() meanwhile ends the
+        build with `ready` still False.
+        """
+        self.clear()
+        generation = self._generation
+        self._queued = {}
+        entries = []
+        for i, channel in enumerate(list(data)):
+            found = channel_titles(data, channel)
+            if found is not None:
+                entries.extend(zip(found[2], found[0], found[1], [channel] * len(found[0])))
+            if i % step == step - 1:
+                yield i + 1
+                if self._generation != generation:
+                    return
+        entries.sort(key=lambda entry: entry[0])
+        for batch in batched(entries, step * 20):
+            for published, video_id, title, channel in batch:
+                self._add(channel, video_id, title, published, append=True)
+            yield len(data)
+            if self._generation != generation:
+                return
+        self._vocabulary = sorted(self._postings)
+        queued, self._queued = self._queued, None
+        self.ready = True
+        for channel, changed_in in queued.items():
+            if changed_in is None:
+                self.remove_channel(channel)
+            else:
+                self.set_channel(channel, changed_in)
+
+    def set_channel(self, channel, data):
+        """Bring one channel up to date after its videos in `data` changed. A no-op until built."""
+        if not self.ready:
+            if self._queued is not None:
+                self._queued[channel] = data
+            return
+        found = channel_titles(data, channel)
+        if found is None:
+            self.remove_channel(channel)
+            return
+        docs = {self._video_ids[doc]: doc for doc in self._channel_docs.get(channel, ())}
+        kept = array("q")
+        for video_id, title, published in zip(*found):
+            doc = docs.pop(video_id, None)
+            if doc is not None and self._titles[doc] == title:
+                kept.append(doc)
+                continue
+            if doc is not None:
+                self._kill(doc)
+            kept.append(self._add(channel, video_id, title, published))
+        for doc in docs.values():
+            self._kill(doc)
+        self._channel_docs[channel] = kept
+        self._drop_dead_if_many()
+
+    def remove_channel(self, channel):
+        if not self.ready:
+            if self._queued is not None:
+                self._queued[channel] = None
+            return
+        for doc in self._channel_docs.pop(channel, ()):
+            self._kill(doc)
+        self._drop_dead_if_many()
+
+    def _add(self, channel, video_id, title, published, append=False) -> int:
+        self._word_sets = {}
+        doc = len(self._channels)
+        self._channels.append(channel)
+        self._video_ids.append(video_id)
+        self._titles.append(title)
+        self._published.append(published)
+        self._alive.append(1)
+        if append:
+            self._channel_docs.setdefault(channel, array("q")).append(doc)
+        key = self._published.__getitem__
+        for word in set(words(title)):
+            docs = self._postings.get(word)
+            if docs is None:
+                self._postings[word] = [doc]
+                if not append:
+                    insort(self._vocabulary, word)
+            elif append:
+                docs.append(doc)
+            else:
+                insort(docs, doc, key=key)
+        return doc
+
+    def _kill(self, doc):
+        self._word_sets = {}
+        if self._alive[doc]:
+            self._alive[doc] = 0
+            self._dead += 1
+
+    def _drop_dead_if_many(self):
+        if self._dead * 2 <= len(self._alive):
+            return
+        alive = self._alive
+        for word, docs in list(self._postings.items()):
+            kept = [doc for doc in docs if alive[doc]]
+            if kept:
+                self._postings[word] = kept
+            else:
+                del self._postings[word]
+        self._vocabulary = sorted(self._postings)
+        self._dead = 0
+
+    def _prefix_words(self, prefix) -> list:
+        vocabulary = self._vocabulary
+        start = bisect_left(vocabulary, prefix)
+        return vocabulary[start:bisect_left(vocabulary, prefix + PREFIX_END, start)]
+
+    def search_steps(self, query, limit=200, step=256):
+        """Yield None after every `step` candidates looked at, and finally the ranked Matches.
+
+        A caller that stops iterating (e.g. a newer keystroke came in)
+        abandons the search there.
+        """
+        query_words = list(dict.fromkeys(words(query)))
+        if not self.ready or not query_words:
+            yield []
+            return
+        postings = self._postings
+        ranges = {word: self._prefix_words(word) for word in query_words}
+        sizes = {word: sum(len(postings[w]) for w in ranges[word]) for word in query_words}
+        rarest = min(query_words, key=sizes.__getitem__)
+        if not sizes[rarest]:
+            yield []
+            return
+        # the other words are checked against a set of their docs when that is cheap
+        # enough to build, and against the candidate's title otherwise; typing on
+        # keeps the earlier words, so their sets are kept for the next query
+        docs_of = {
+            word: self._word_sets.get(word) or set().union(*(postings[w] for w in ranges[word]))
+            for word in query_words if word != rarest and sizes[word] <= SET_CHECK_MAX
+        }
+        self._word_sets = docs_of
+        title_checked = [word for word in query_words if word != rarest and word not in docs_of]
+
+        key = self._published.__getitem__
+        rarest_words = ranges[rarest]
+        if len(rarest_words) == 1:
+            candidates = reversed(postings[rarest_words[0]])
+        else:
+            # a title can hold several words of the range, each doc is looked at once
+            merged = heapq.merge(*(reversed(postings[w]) for w in rarest_words), key=key, reverse=True)
+            candidates = unique(merged)
+        alive, titles = self._alive, self._titles
+        found = []
+        for batch in batched(candidates, step):
+            docs = filter(alive.__getitem__, batch)
+            for other in docs_of.values():
+                docs = filter(other.__contains__, docs)
+            for doc in docs:
+                title = titles[doc].casefold()
+                # a substring test first, it rules out most titles without splitting them
+                if not all(word in title for word in title_checked):
+                    continue
+                title_words = WORD.findall(title)
+                if all(any(w.startswith(word) for w in title_words) for word in title_checked):
+                    whole = all(word in title_words for word in query_words)
+                    found.append(Match(self._channels[doc], self._video_ids[doc], whole))
+                    if len(found) == limit:
+                        break
+            if len(found) == limit:
+                break
+            yield None
+        # stable, so newest first within each group
+        found.sort(key=lambda match: not match.whole)
+        yield found
+
+    def search(self, query, limit=200) -> list:
+        """Ranked Matches of every word of `query`, at most `limit`."""
+        for result in self.search_steps(query, limit):
+            pass
+        return result
+
+    def stats(self) -> str:
+        return f"{self._alive.count(1)} titles, {len(self._postings)} words, {self._dead} dead entries"
@@ -0,0 +1,329 @@
+"""Columnar, memory-mapped cache of DATA (channel -> list of Video).
+
+Every Video field is stored as one contiguous column, videos grouped by
+channel in DATA order:
+
+    _id           12 bytes per video
+    published_at  int64 microseconds since the epoch (naive UTC, as pymongo returns it)
+    seen          bitset, one bit per video
+    title, video_id, url, duration, channel names
+                  string tables: int64 offsets (n + 1) followed by a utf-8 blob
+    channel_start int64 (channels + 1), first video index of each channel
+    channel_max_id, channel_max_published_at
+                  12 bytes and int64 per channel, its newest _id and published_at
+
+The file is mapped read-only at startup and only the channel names are
+decoded; a channel's Video objects are built the first time it is looked up.
+"""
+import mmap
+import os
+import struct
+from array import array
+from collections.abc import MutableMapping
+from functools import cached_property
+from operator import attrgetter
+from bson import ObjectId
+
+from video_browser.models import Video
+
+
+MAGIC = b"VSNAP\x00\x00\x01"
+VERSION = 2
+SECTIONS = (
+    "channel_offsets", "channel_blob", "channel_start",
+    "_id", "published_at", "seen",
+    "title_offsets", "title_blob",
+    "video_id_offsets", "video_id_blob",
+    "url_offsets", "url_blob",
+    "duration_offsets", "duration_blob",
+    "channel_max_id", "channel_max_published_at",
+)
+STRING_COLUMNS = ("title", "video_id", "url", "duration")
+HEADER = struct.Struct("<8sIQQ")
+SECTION_ENTRY = struct.Struct("<QQ")
+
+class _StringColumn:
+    def __init__(self, offsets, blob):
+        self.offsets = offsets
+        self.blob = blob
+
+    def raw(self, i) -> bytes:
+        return bytes(self.blob[self.offsets[i]:self.offsets[i + 1]])
+
+    def __getitem__(self, i) -> str:
+        return self.raw(i).decode()
+
+
+class Snapshot:
+    """A read-only view over a snapshot file."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._views = []
+
+        buffer = self._view(memoryview(self._mmap))
+        magic, version, self.channel_count, self.video_count = HEADER.unpack_from(buffer)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a version {VERSION} video snapshot")
+
+        sections = {}
+        position = HEADER.size
+        for name in SECTIONS:
+            offset, length = SECTION_ENTRY.unpack_from(buffer, position)
+            sections[name] = self._view(buffer[offset:offset + length])
+            position += SECTION_ENTRY.size
+
+        def int64s(name):
+            return self._view(sections[name].cast("q"))
+
+        self.channel_start = int64s("channel_start")
+        self.channel_max_published_at = int64s("channel_max_published_at")
+        self._channel_max_ids = sections["channel_max_id"]
+        self.published_at = int64s("published_at")
+        self._ids = sections["_id"]
+        self._seen = sections["seen"]
+        self._strings = {
+            name: _StringColumn(int64s(f"{name}_offsets"), sections[f"{name}_blob"])
+            for name in STRING_COLUMNS
+        }
+        channel_names = _StringColumn(int64s("channel_offsets"), sections["channel_blob"])
+        self.channels = [channel_names[i] for i in range(self.channel_count)]
+        self.channel_index = {name: i for i, name in enumerate(self.channels)}
+
+    def _view(self, view):
+        self._views.append(view)
+        return view
+
+    def rows(self, channel) -> range:
+        i = self.channel_index[channel]
+        return range(self.channel_start[i], self.channel_start[i + 1])
+
+    @cached_property
+    def max_raw_id(self) -> bytes | None:
+        """The newest raw _id in the file, None when it holds no videos."""
+        if not self.video_count:
+            return None
+        ids = self._channel_max_ids
+        # empty channels are stored as zeros, which never win
+        return max(bytes(ids[i:i + 12]) for i in range(0, len(ids), 12))
+
+    def raw_watermark(self, channel):
+        """(max raw _id, max published_ts) of a channel as written, or (None, None) when it has no videos."""
+        i = self.channel_index[channel]
+        if self.channel_start[i] == self.channel_start[i + 1]:
+            return None, None
+        return bytes(self._channel_max_ids[i * 12:i * 12 + 12]), self.channel_max_published_at[i]
+
+    def seen(self, row) -> bool:
+        return bool(self._seen[row >> 3] & (1 << (row & 7)))
+
+    def raw_id(self, row) -> bytes:
+        return bytes(self._ids[row * 12:row * 12 + 12])
+
+    def video(self, row) -> Video:
+        strings = self._strings
+        return Video(
+            _id=ObjectId(self.raw_id(row)),
+            title=strings["title"][row],
+            video_id=strings["video_id"][row],
+            published_at=self.published_at[row],
+            url=strings["url"][row],
+            duration=strings["duration"][row],
+            seen=self.seen(row),
+        )
+
+    def videos(self, channel) -> list[Video]:
+        return [self.video(row) for row in self.rows(channel)]
+
+    def strings(self, channel, name) -> list[str]:
+        column = self._strings[name]
+        return [column[row] for row in self.rows(channel)]
+
+    def raw_rows(self, channel):
+        """Rows as written, without building Video objects (see write_snapshot)."""
+        strings = self._strings
+        for row in self.rows(channel):
+            yield (
+                self.raw_id(row),
+                self.published_at[row],
+                self.seen(row),
+                *(strings[name].raw(row) for name in STRING_COLUMNS),
+            )
+
+    def close(self):
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._mmap.close()
+        self._file.close()
+
+
+class SnapshotData(MutableMapping):
+    """DATA backed by a Snapshot: channel -> list of Video, decoded on first access."""
+
+    def __init__(self, snapshot: Snapshot):
+        self.snapshot = snapshot
+        self._decoded = {}
+        self._order = dict.fromkeys(snapshot.channels)
+
+    def is_decoded(self, channel) -> bool:
+        return channel in self._decoded or channel not in self.snapshot.channel_index
+
+    def decoded_channels(self) -> list:
+        """Channels held as Video lists: decoded ones and those set since loading."""
+        return list(self._decoded)
+
+    def __getitem__(self, channel):
+        try:
+            return self._decoded[channel]
+        except KeyError:
+            if channel not in self._order:
+                raise
+        videos = self._decoded[channel] = self.snapshot.videos(channel)
+        return videos
+
+    def __setitem__(self, channel, videos):
+        self._decoded[channel] = videos
+        self._order[channel] = None
+
+    def __delitem__(self, channel):
+        del self._order[channel]
+        self._decoded.pop(channel, None)
+
+    def __iter__(self):
+        return iter(self._order)
+
+    def __len__(self):
+        return len(self._order)
+
+    def published_timestamps(self, channel) -> list[int]:
+        """published_ts of every video of a channel, without decoding undecoded channels."""
+        if self.is_decoded(channel):
+            return [video.published_ts for video in self[channel]]
+        rows = self.snapshot.rows(channel)
+        return self.snapshot.published_at[rows.start:rows.stop].tolist()
+
+    def strings(self, channel, name) -> list[str]:
+        """One string field (e.g. "title") of every video of a channel, without decoding undecoded channels."""
+        if self.is_decoded(channel):
+            return [getattr(video, name) for video in self[channel]]
+        return self.snapshot.strings(channel, name)
+
+
+def raw_video_watermark(videos):
+    """(max raw _id, max published_ts) of a list of Video, (None, None) when it is empty.
+
+    ObjectIds order like their raw bytes, so no ObjectId or datetime is built per video.
+    """
+    if not videos:
+        return None, None
+    return max(map(attrgetter("_oid"), videos)), max(map(attrgetter("published_ts"), videos))
+
+
+def _raw_rows(videos):
+    for video in videos:
+        yield (
+            video._oid,
+            video.published_ts,
+            video.seen,
+            *(str(getattr(video, name)).encode() for name in STRING_COLUMNS),
+        )
+
+
+def load_snapshot(path) -> SnapshotData:
+    return SnapshotData(Snapshot(path))
+
+
+def snapshot_items(data) -> list:
+    """(channel, rows) of `data` (a dict or SnapshotData) as it is now, for write_snapshot.
+
+    Only the channel lists are copied, not the videos, so this is cheap
+    enough for the UI thread and leaves a worker thread nothing to iterate
+    that the UI can still add to or remove from.
+    """
+    if isinstance(data, SnapshotData):
+        return [
+            (channel, _raw_rows(list(data[channel])) if data.is_decoded(channel) else data.snapshot.raw_rows(channel))
+            for channel in data
+        ]
+    return [(channel, _raw_rows(list(videos))) for channel, videos in data.items()]
+
+
+def write_snapshot(path, data):
+    """Write `data` (a dict, a SnapshotData or what snapshot_items took of one) to `path` atomically."""
+    items = data if isinstance(data, list) else snapshot_items(data)
+
+    channel_names = []
+    channel_start = array("q", [0])
+    channel_max_ids = bytearray()
+    channel_max_published_at = array("q")
+    ids = bytearray()
+    published_at = array("q")
+    seen = bytearray()
+    strings = {name: (array("q", [0]), bytearray()) for name in STRING_COLUMNS}
+
+    count = 0
+    for channel, rows in items:
+        channel_names.append(channel.encode())
+        max_id, max_published = bytes(12), -(1 << 63)
+        for _id, published, is_seen, *values in rows:
+            ids += _id
+            published_at.append(published)
+            if _id > max_id:
+                max_id = _id
+            if published > max_published:
+                max_published = published
+            if count % 8 == 0:
+                seen.append(0)
+            if is_seen:
+                seen[-1] |= 1 << (count % 8)
+            for name, value in zip(STRING_COLUMNS, values):
+                offsets, blob = strings[name]
+                blob += value
+                offsets.append(len(blob))
+            count += 1
+        channel_start.append(count)
+        channel_max_ids += max_id
+        channel_max_published_at.append(max_published)
+
+    channel_offsets = array("q", [0])
+    channel_blob = bytearray()
+    for name in channel_names:
+        channel_blob += name
+        channel_offsets.append(len(channel_blob))
+
+    payloads = {
+        "channel_offsets": channel_offsets.tobytes(),
+        "channel_blob": channel_blob,
+        "channel_start": channel_start.tobytes(),
+        "_id": ids,
+        "published_at": published_at.tobytes(),
+        "seen": seen,
+        "channel_max_id": channel_max_ids,
+        "channel_max_published_at": channel_max_published_at.tobytes(),
+    }
+    for name, (offsets, blob) in strings.items():
+        payloads[f"{name}_offsets"] = offsets.tobytes()
+        payloads[f"{name}_blob"] = blob
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        position = _align(HEADER.size + SECTION_ENTRY.size * len(SECTIONS))
+        table = bytearray(HEADER.pack(MAGIC, VERSION, len(channel_names), count))
+        for name in SECTIONS:
+            table += SECTION_ENTRY.pack(position, len(payloads[name]))
+            position = _align(position + len(payloads[name]))
+        f.write(table)
+        for name in SECTIONS:
+            f.seek(_align(f.tell()))
+            f.write(payloads[name])
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _align(position, to=8):
+    return (position + to - 1) // to * to
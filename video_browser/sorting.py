@@ -0,0 +1,114 @@
+import re
+
+# columns a channel's videos can be sorted by, and the direction each starts in
+SORT_COLUMNS = {"time": True, "title": False, "duration": False, "seen": False}
+# newest first, the order the views return
+DEFAULT_SORT = (("time", True),)
+# sort specs kept per channel; a channel rarely sees more than a handful
+MAX_ORDERS_PER_CHANNEL = 8
+ISO_DURATION = re.compile(r"P(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?")
+
+_duration_seconds = {}
+
+
+def parse_duration(text) -> int | None:
+    """Seconds of "H:MM:SS", "M:SS" or ISO 8601 ("PT1H2M3S"); None for "N/A" or anything else."""
+    if not isinstance(text, str):
+        return None
+    if ":" in text:
+        seconds = 0
+        for part in text.split(":"):
+            if not part.isdigit():
+                return None
+            seconds = seconds * 60 + int(part)
+        return seconds
+    match = ISO_DURATION.fullmatch(text)
+    if match is None or not any(match.groups()):
+        return None
+    days, hours, minutes, seconds = (int(group or 0) for group in match.groups())
+    return ((days * 24 + hours) * 60 + minutes) * 60 + seconds
+
+
+def duration_seconds(text) -> int:
+    """parse_duration, once per distinct string (Video interns them); unknown durations sort as -1."""
+    try:
+        return _duration_seconds[text]
+    except KeyError:
+        seconds = parse_duration(text)
+        seconds = _duration_seconds[text] = -1 if seconds is None else seconds
+        return seconds
+
+
+def sort_values(videos, column) -> list:
+    if column == "time":
+        return [video.published_ts for video in videos]
+    if column == "title":
+        return [video.title.casefold() for video in videos]
+    if column == "duration":
+        return [duration_seconds(video.duration) for video in videos]
+    if column == "seen":
+        return [video.seen for video in videos]
+    raise KeyError(column)
+
+
+def sort_order(count, values, spec) -> list[int]:
+    """Indices of `count` videos in `spec` order, given each spec column's values."""
+    order = list(range(count))
+    # stable sorts from the least significant key up give the multi-key order
+    for column, reverse in reversed(spec):
+        order.sort(key=values[column].__getitem__, reverse=reverse)
+    return order
+
+
+class SortOrders:
+    """Per-channel permutations of a channel's videos, one per sort spec.
+
+    A spec is a tuple of (column, reverse) pairs, most significant first.
+    Permutations are index lists into the channel's video list, sorted over
+    per-column value lists that are themselves built once, so switching
+    back to an order seen before is a lookup. Everything of a channel is
+    dropped when it is asked about a different list object than last time;
+    changes made in place (a merge, a seen toggle) call `invalidate()`.
+    """
+
+    def __init__(self):
+        self._channels = {}  # channel -> (videos, len(videos), {column: values}, {spec: order})
+        self.hits = 0
+        self.misses = 0
+
+    def order(self, channel, videos, spec) -> list[int]:
+        entry = self._channels.get(channel)
+        if entry is None or entry[0] is not videos or entry[1] != len(videos):
+            entry = self._channels[channel] = (videos, len(videos), {}, {})
+        _, count, values, orders = entry
+        order = orders.get(spec)
+        if order is not None:
+            self.hits += 1
+            return order
+        self.misses += 1
+        for column, _ in spec:
+            if column not in values:
+                values[column] = sort_values(videos, column)
+        if len(orders) >= MAX_ORDERS_PER_CHANNEL:
+            del orders[next(iter(orders))]
+        order = orders[spec] = sort_order(count, values, spec)
+        return order
+
+    def invalidate(self, channel, column=None):
+        """Forget a channel's orders, or only those that depend on `column`."""
+        entry = self._channels.get(channel)
+        if entry is None:
+            return
+        if column is None:
+            del self._channels[channel]
+            return
+        _, _, values, orders = entry
+        values.pop(column, None)
+        for spec in [spec for spec in orders if any(name == column for name, _ in spec)]:
+            del orders[spec]
+
+    def clear(self):
+        self._channels = {}
+
+    def stats(self) -> str:
+        return f"{len(self._channels)} channels, {self.hits} hits, {self.misses} misses"
@@ -0,0 +1,47 @@
+import time
+
+
+def format_age(seconds) -> str:
+    """A short age for list labels: 45s, 12m, 3h, 2d."""
+    for unit, size in (("d", 86400), ("h", 3600), ("m", 60)):
+        if seconds >= size:
+            return f"{int(seconds // size)}{unit}"
+    return f"{max(int(seconds), 0)}s"
+
+
+class ChannelStaleness:
+    """Which channels are only known from a local cache, and how old that cache is.
+
+    Channels rendered from the cache at startup are stale until a background
+    revalidation (or a load) confirms them against MongoDB, one by one with
+    `mark_fresh()` or all at once with `mark_all_fresh()`. Channels that
+    arrive later never came from the cache and are fresh.
+    """
+
+    def __init__(self):
+        # time.time() when the cache was written, None when nothing came from a cache
+        self.cached_at = None
+        self.stale = set()
+
+    def mark_cached(self, channels, cached_at):
+        """`channels` were shown from a cache written at `cached_at` (None: no cache)."""
+        self.cached_at = cached_at
+        self.stale = set(channels) if cached_at is not None else set()
+
+    def mark_fresh(self, channel):
+        """`channel` has been confirmed (or dropped)."""
+        self.stale.discard(channel)
+
+    def mark_all_fresh(self):
+        """Everything has been confirmed; later channels are fresh too."""
+        self.cached_at = None
+        self.stale.clear()
+
+    def is_stale(self, channel) -> bool:
+        return channel in self.stale
+
+    def suffix(self, channel, now=None) -> str:
+        """" · 3h old" for a stale channel, "" otherwise."""
+        if not self.is_stale(channel):
+            return ""
+        return f" · {format_age((now or time.time()) - self.cached_at)} old"
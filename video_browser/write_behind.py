@@ -0,0 +1,66 @@
+import asyncio
+import time
+from dataclasses import dataclass
+
+
+@dataclass
+class FlushReport:
+    """What one flush wrote, how long the round trip took and whether it failed."""
+    writes: int
+    seconds: float
+    error: Exception | None = None
+
+
+class SeenWriteBehind:
+    """Collects `seen` toggles in memory and writes them out as a single bulk write.
+
+    Repeated toggles of the same `_id` coalesce into one update, and a video
+    toggled back to the value it had before the first queued toggle drops out
+    of the queue entirely. Toggles keep being recorded while a flush is in
+    flight; they go out with the next one.
+    """
+
+    def __init__(self, repository):
+        self._repository = repository
+        self._flush_lock = asyncio.Lock()
+        self._pending = {}    # _id -> seen value to write
+        self._persisted = {}  # _id -> seen value stored before the first queued toggle
+
+    def __len__(self):
+        return len(self._pending)
+
+    def record(self, _id, seen, previous):
+        """Queue `seen` for `_id`; `previous` is the value it replaces."""
+        persisted = self._persisted.setdefault(_id, previous)
+        if seen == persisted:
+            del self._persisted[_id]
+            self._pending.pop(_id, None)
+        else:
+            self._pending[_id] = seen
+
+    async def flush(self) -> FlushReport | None:
+        """Write everything queued so far. Returns None when there was nothing to write."""
+        async with self._flush_lock:
+            if not self._pending:
+                return None
+            batch, self._pending = self._pending, {}
+            persisted, self._persisted = self._persisted, {}
+
+            start = time.perf_counter()
+            try:
+                await self._repository.set_seen_many(batch)
+            except Exception as e:
+                self._requeue(batch, persisted)
+                return FlushReport(len(batch), time.perf_counter() - start, e)
+            return FlushReport(len(batch), time.perf_counter() - start)
+
+    def _requeue(self, batch, persisted):
+        for _id, seen in batch.items():
+            # toggles recorded during the failed flush assumed it had landed
+            self._persisted[_id] = persisted[_id]
+            current = self._pending.get(_id, seen)
+            if current == persisted[_id]:
+                del self._persisted[_id]
+                self._pending.pop(_id, None)
+            else:
+                self._pending[_id] = current